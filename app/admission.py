@@ -0,0 +1,184 @@
+import math
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from starlette.requests import HTTPConnection
+
+from app.config import settings
+from app.llm import llm_client
+
+
+class AdmissionRejected(Exception):
+    """An LLM-bound request was turned away; status_code is 429 or 503."""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Admission control for the LLM stage only; local tiers never pass through it.
+
+    Each client (API key, else IP) has a token bucket of `burst` requests
+    refilled at `rate` per second; an empty bucket gives 429. At most
+    `max_pending` requests may be waiting for or inside the LLM stage; beyond
+    that requests get 503 straight away instead of queueing. Both carry a
+    Retry-After estimate.
+    """
+
+    def __init__(self, max_pending: int, rate: float, burst: float, max_clients: int = 10000,
+                 latency_estimate: Callable[[], Optional[float]] = None, concurrency: int = 1):
+        self.max_pending = max_pending
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.latency_estimate = latency_estimate
+        self.concurrency = max(concurrency, 1)
+        self.pending = 0
+        self._buckets = OrderedDict()
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+
+    def _bucket(self, client: str) -> TokenBucket:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+
+    def _queue_wait(self) -> int:
+        """Seconds until the current queue has drained, from the LLM's recent median latency."""
+        latency = self.latency_estimate() if self.latency_estimate is not None else None
+        return max(1, math.ceil((latency or 1.0) * self.pending / self.concurrency))
+
+    def acquire(self, client: str):
+        if self.pending >= self.max_pending:
+            self.overloaded += 1
+            raise AdmissionRejected(503, self._queue_wait(), "The assistant is busy. Please try again shortly.")
+        if self.rate > 0:
+            wait = self._bucket(client or "anonymous").take()
+            if wait:
+                self.rate_limited += 1
+                raise AdmissionRejected(429, max(1, math.ceil(wait)), "Too many questions. Please slow down.")
+        self.pending += 1
+        self.admitted += 1
+
+    def release(self):
+        self.pending -= 1
+
+    @contextmanager
+    def admit(self, client: str):
+        self.acquire(client)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "clients": len(self._buckets),
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "overloaded": self.overloaded,
+        }
+
+
+class ConnectionLimiter:
+    """Caps the number of open WebSocket chat connections on this worker."""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.open = 0
+        self.opened = 0
+        self.refused = 0
+
+    def try_open(self) -> bool:
+        if self.max_connections and self.open >= self.max_connections:
+            self.refused += 1
+            return False
+        self.open += 1
+        self.opened += 1
+        return True
+
+    def close(self):
+        self.open -= 1
+
+    def stats(self) -> dict:
+        return {
+            "open": self.open,
+            "max_connections": self.max_connections,
+            "opened": self.opened,
+            "refused": self.refused,
+        }
+
+
+def client_id(request: HTTPConnection) -> str:
+    """API key when one is sent, otherwise the client IP (first X-Forwarded-For hop if trusted)."""
+    api_key = request.headers.get("x-api-key")
+    if not api_key:
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            api_key = authorization[7:].strip()
+    if api_key:
+        return "key:" + api_key
+    if settings.admission_trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return "ip:" + forwarded.split(",")[0].strip()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def _median_llm_latency() -> Optional[float]:
+    return llm_client.models[0].latency.percentile(50)
+
+
+admission = AdmissionController(
+    max_pending=settings.llm_max_concurrency + settings.admission_max_queue,
+    rate=settings.admission_client_rate,
+    burst=settings.admission_client_burst,
+    max_clients=settings.admission_max_clients,
+    latency_estimate=_median_llm_latency,
+    concurrency=settings.llm_max_concurrency,
+) if settings.admission_enabled else None
+
+
+socket_limiter = ConnectionLimiter(settings.ws_max_connections)
+
+
+@contextmanager
+def admit(client: Optional[str]):
+    """Hold an LLM admission slot for the block; a no-op when admission control is disabled."""
+    if admission is None:
+        yield
+        return
+    with admission.admit(client):
+        yield
@@ -0,0 +1,73 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class Automaton:
+    """
+    Aho-Corasick multi-pattern matcher.
+
+    Patterns are compiled once into a trie with failure links; find_all()
+    then reports every occurrence of every pattern in a single left-to-right
+    pass over the text, so the cost of a scan does not depend on how many
+    patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self.patterns = []
+        for pattern in dict.fromkeys(patterns):
+            if pattern:
+                self._add(pattern)
+                self.patterns.append(pattern)
+        self._link()
+
+    def _add(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (pattern,)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """Return (start index, pattern) for every match in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in output[state]:
+                matches.append((end - len(pattern) + 1, pattern))
+        return matches
+
+    def contains_any(self, text: str) -> bool:
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+        return False
@@ -0,0 +1,389 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (OrderedDict node, tuple, key tuple) in bytes
+_ENTRY_OVERHEAD = 200
+
+
+def history_digest(conversation_history: Optional[list]) -> str:
+    """Stable digest of the conversation history; empty history digests to ''."""
+    if not conversation_history:
+        return ""
+    encoded = json.dumps(conversation_history, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def make_cache_key(context_name: str, language: str, question: str, conversation_history: Optional[list]) -> Tuple[str, str, str, str]:
+    return (
+        (context_name or "").lower(),
+        language or "en",
+        normalize_text(question),
+        history_digest(conversation_history),
+    )
+
+
+class SharedAnswerStore:
+    """
+    Answer store shared by every worker process on the host, in a SQLite
+    database in WAL mode: readers never block the writer or each other, and a
+    hit is one primary-key lookup.
+
+    Nothing on the event loop waits on the database. get() reads on a
+    connection opened with a zero busy timeout, and a read that finds the
+    database locked is skipped (counted in `busy`) as a miss. set() only
+    queues the answer; run(), started with the app, creates the schema and
+    then writes the queue in batches on a thread, as the query log does. A
+    queue longer than `max_pending` drops new answers, which only costs the
+    other workers a miss.
+
+    Expiry uses wall-clock time so all processes agree on it. Hits do not write,
+    so eviction is oldest-first rather than LRU: expired rows are purged and the
+    rows closest to expiry dropped until max_entries and max_bytes hold again.
+    The writer checks the bounds every `check_every` writes. The row count and
+    total size are kept in a one-row table that triggers update on every
+    insert, update and delete, so neither eviction nor stats() scans the answers.
+    """
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int, ttl: float, check_every: int = 64,
+                 flush_interval: float = 0.5, batch_size: int = 64, max_pending: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.check_every = check_every
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._reader = None
+        self._writer = None
+        self._reader_pid = None
+        self._ready_pid = None
+        self._pending: List[Tuple[bytes, str, int, float]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.busy = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether this process has opened the store (run() does, on a thread)."""
+        return self._ready_pid == os.getpid()
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        # A connection must not cross a fork, so each worker opens its own
+        if self._reader is None or self._reader_pid != os.getpid():
+            self._reader = sqlite3.connect(self.path, timeout=0, isolation_level=None, check_same_thread=False)
+            self._reader_pid = os.getpid()
+        return self._reader
+
+    def open(self):
+        """Open the writer connection and create the schema. Blocking: run it off the event loop."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Only the writer thread uses this connection, so it may wait for other workers' writes
+        connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._create_schema(connection)
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        self._writer = connection
+        self._ready_pid = os.getpid()
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection):
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key BLOB PRIMARY KEY, answer TEXT NOT NULL, size INTEGER NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS answers_expires_at ON answers (expires_at)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS answers_totals ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS answers_insert AFTER INSERT ON answers BEGIN "
+            "UPDATE answers_totals SET entries = entries + 1, bytes = bytes + new.size; END"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS answers_update AFTER UPDATE OF size ON answers BEGIN "
+            "UPDATE answers_totals SET bytes = bytes + new.size - old.size; END"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS answers_delete AFTER DELETE ON answers BEGIN "
+            "UPDATE answers_totals SET entries = entries - 1, bytes = bytes - old.size; END"
+        )
+        # Counted once, when the totals table is new (a store written before it existed)
+        if connection.execute("SELECT 1 FROM answers_totals").fetchone() is None:
+            connection.execute("INSERT INTO answers_totals SELECT 0, count(*), total(size) FROM answers")
+
+    @staticmethod
+    def _key(key: tuple) -> bytes:
+        return hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=16).digest()
+
+    def _failed(self, action: str, error: sqlite3.Error):
+        if isinstance(error, sqlite3.OperationalError) and "locked" in str(error):
+            self.busy += 1
+            logger.debug("Shared answer store busy, %s skipped", action)
+        else:
+            self.errors += 1
+            logger.warning("Shared answer store %s failed: %s", action, error)
+
+    def get(self, key: tuple) -> Optional[Tuple[str, float]]:
+        """(answer, seconds left to live) or None; a miss until the store is open."""
+        if not self.ready:
+            return None
+        try:
+            row = self.reader.execute(
+                "SELECT answer, expires_at FROM answers WHERE key = ? AND expires_at > ?",
+                (self._key(key), time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], row[1] - time.time()
+
+    def set(self, key: tuple, answer: str):
+        """Queue an answer for the writer; never blocks."""
+        size = AnswerCache._size(key, answer)
+        if size > self.max_bytes:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append((self._key(key), answer, size, time.time() + self.ttl))
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self):
+        """Open the store, then write queued answers until cancelled, then write whatever is left."""
+        try:
+            await asyncio.to_thread(self.open)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Could not open the shared answer store %s: %s", self.path, e)
+            return
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                batch = self._take()
+                if batch:
+                    await asyncio.to_thread(self._write, batch)
+        finally:
+            self._wakeup = None
+            self.flush()
+
+    def flush(self):
+        """Write queued answers synchronously (used on shutdown)."""
+        batch = self._take()
+        if batch and self.ready:
+            self._write(batch)
+
+    def _take(self) -> list:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _write(self, batch: list):
+        connection = self._writer
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # An upsert rather than INSERT OR REPLACE: the implicit delete of REPLACE fires no trigger
+                connection.executemany(
+                    "INSERT INTO answers (key, answer, size, expires_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET answer = excluded.answer, size = excluded.size, "
+                    "expires_at = excluded.expires_at",
+                    batch
+                )
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+            self.written += len(batch)
+            checks, self._writes = self._writes // self.check_every, self._writes + len(batch)
+            if self._writes // self.check_every > checks:
+                self.evict()
+        except sqlite3.Error as e:
+            self._failed("write", e)
+
+    def _totals(self, connection: sqlite3.Connection) -> Tuple[int, int]:
+        return connection.execute("SELECT entries, bytes FROM answers_totals").fetchone()
+
+    def evict(self):
+        """Purge expired rows, then the oldest rows until both bounds hold. Runs on the writer thread."""
+        connection = self._writer
+        connection.execute("DELETE FROM answers WHERE expires_at <= ?", (time.time(),))
+        while True:
+            entries, total_bytes = self._totals(connection)
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                return
+            excess = max(entries - self.max_entries, 1, entries // 10 if total_bytes > self.max_bytes else 0)
+            connection.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+
+    def clear(self):
+        """Delete every answer. Blocking: for maintenance scripts, not the event loop."""
+        self._pending.clear()
+        if not self.ready:
+            self.open()
+        self._writer.execute("DELETE FROM answers")
+
+    def stats(self) -> dict:
+        """Entries and bytes include expired rows not yet purged by evict()."""
+        entries = total_bytes = None
+        if self.ready:
+            try:
+                entries, total_bytes = self._totals(self.reader)
+            except sqlite3.Error:
+                pass
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "busy": self.busy,
+            "errors": self.errors,
+        }
+
+
+class AnswerCache:
+    """
+    In-process LRU cache of LLM answers with TTL expiry and a memory bound.
+    Entries are evicted least-recently-used first when either max_entries or
+    max_bytes is exceeded. With a SharedAnswerStore, local misses fall through
+    to it and every answer is written to both, so other workers see it.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, shared: SharedAnswerStore = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(key: tuple, answer: str) -> int:
+        return len(answer.encode("utf-8")) + sum(len(part.encode("utf-8")) for part in key) + _ENTRY_OVERHEAD
+
+    def get(self, key: tuple) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            if self.shared is not None:
+                shared = self.shared.get(key)
+                if shared is not None:
+                    answer, ttl = shared
+                    self._store(key, answer, ttl)
+                    return answer
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: tuple, answer: str):
+        self._store(key, answer, self.ttl)
+        if self.shared is not None:
+            self.shared.set(key, answer)
+
+    def _store(self, key: tuple, answer: str, ttl: float):
+        size = self._size(key, answer)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, answer, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: tuple):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+answer_cache = AnswerCache(
+    max_entries=settings.answer_cache_max_entries,
+    max_bytes=settings.answer_cache_max_bytes,
+    ttl=settings.answer_cache_ttl,
+    shared=SharedAnswerStore(
+        path=settings.answer_store_path,
+        max_entries=settings.answer_store_max_entries,
+        max_bytes=settings.answer_store_max_bytes,
+        ttl=settings.answer_cache_ttl,
+    ) if settings.answer_store_path else None,
+) if settings.answer_cache_enabled else None
@@ -0,0 +1,94 @@
+"""Canned replies for greetings and general questions about the service."""
+from typing import Optional
+
+from app.text import tokenize
+
+GREETINGS = {
+    "en": ["hi", "hello", "hey", "good morning", "good afternoon", "good evening", "greetings", "welcome"],
+    "si": ["හායි", "හලෝ", "ආයුබෝවන්", "සුබ උදෑසනක්", "සුබ දවසක්", "සුබ සන්ධ්‍යාවක්", "නමස්කාර"],
+    "ta": ["வணக்கம்", "ஹலோ", "ஹாய்", "காலை வணக்கம்", "மாலை வணக்கம்", "நமஸ்காரம்"]
+}
+
+# The canned answers describe the President's Fund, so other contexts never get them
+CANNED_CONTEXTS = ("presidents_fund",)
+
+COMMON_QUESTIONS = {
+    "en": {
+        "what is": "The President's Fund of Sri Lanka is a government initiative that provides financial assistance for medical treatments, particularly for kidney patients, cancer patients, children with special needs, persons with disabilities, and disaster relief beneficiaries.",
+        "about": "The President's Fund helps Sri Lankan citizens access medical care by providing financial support for surgeries and treatments. Applications can be submitted through local Divisional Secretariats.",
+        "help": "The President's Fund provides medical assistance for various conditions. You can apply through the website (www.presidentsfund.gov.lk), WhatsApp (0740854527), or your nearest Divisional Secretariat.",
+        "services": "The President's Fund offers financial assistance for medical treatments including support for kidney patients, cancer patients, children with special needs, persons with disabilities, and disaster relief situations."
+    },
+    "si": {
+        "what is": "ශ්‍රී ලංකා ජනාධිපති අරමුදල රජයේ මුලපිරීමක් වන අතර එය වෛද්‍ය ප්‍රතිකාර සඳහා, විශේෂයෙන් වකුගඩු රෝගීන්, පිළිකා රෝගීන්, විශේෂ අවශ්‍යතා ඇති දරුවන්, ආබාධිත පුද්ගලයන් සහ ආපදා සහන ලබන්නන් සඳහා මූල්‍ය ආධාර ලබා දෙයි.",
+        "about": "ජනාධිපති අරමුදල ශ්‍රී ලාංකික පුරවැසියන්ට ශල්‍යකර්ම සහ ප්‍රතිකාර සඳහා මූල්‍ය ආධාර ලබා දීමෙන් වෛද්‍ය සේවාවන්ට ප්‍රවේශය ලබා දෙයි. ප්‍රාදේශීය ලේකම් කාර්යාල හරහා අයදුම්පත් ඉදිරිපත් කළ හැකිය.",
+        "help": "ජනාධිපති අරමුදල විවිධ රෝග තත්ත්වයන් සඳහා වෛද්‍ය ආධාර ලබා දෙයි. ඔබට වෙබ් අඩවිය (www.presidentsfund.gov.lk), WhatsApp (0740854527), හෝ ආසන්නතම ප්‍රාදේශීය ලේකම් කාර්යාලය හරහා අයදුම් කළ හැකිය.",
+        "services": "ජනාධිපති අරමුදල වකුගඩු රෝගීන්, පිළිකා රෝගීන්, විශේෂ අවශ්‍යතා ඇති දරුවන්, ආබාධිත පුද්ගලයන් සහ ආපදා තත්ත්වයන් සඳහා මූල්‍ය ආධාර ඇතුළුව වෛද්‍ය ප්‍රතිකාර සඳහා මූල්‍ය ආධාර ලබා දෙයි."
+    },
+    "ta": {
+        "what is": "இலங்கை ஜனாதிபதி நிதியம் அரசாங்கத்தின் முன்முயற்சியாகும், இது மருத்துவ சிகிச்சைகளுக்கு, குறிப்பாக சிறுநீரக நோயாளிகள், புற்றுநோய் நோயாளிகள், சிறப்பு தேவைகள் உள்ள குழந்தைகள், மாற்றுத்திறனாளிகள் மற்றும் பேரிடர் நிவாரண பயனாளிகளுக்கு நிதி உதவி வழங்குகிறது.",
+        "about": "ஜனாதிபதி நிதியம் இலங்கை குடிமக்களுக்கு அறுவை சிகிச்சைகள் மற்றும் சிகிச்சைகளுக்கு நிதி உதவி வழங்குவதன் மூலம் மருத்துவ பராமரிப்பை அணுக உதவுகிறது. உள்ளூர் பிரதேச செயலாளர் அலுவலகங்கள் மூலம் விண்ணப்பங்களை சமர்ப்பிக்க முடியும்.",
+        "help": "ஜனாதிபதி நிதியம் பல்வேறு நிலைமைகளுக்கு மருத்துவ உதவி வழங்குகிறது. நீங்கள் இணையதளம் (www.presidentsfund.gov.lk), WhatsApp (0740854527), அல்லது அருகிலுள்ள பிரதேச செயலாளர் அலுவலகம் மூலம் விண்ணப்பிக்க முடியும்.",
+        "services": "ஜனாதிபதி நிதியம் சிறுநீரக நோயாளிகள், புற்றுநோய் நோயாளிகள், சிறப்பு தேவைகள் உள்ள குழந்தைகள், மாற்றுத்திறனாளிகள் மற்றும் பேரிடர் சூழ்நிலைகளுக்கான ஆதரவு உட்பட மருத்துவ சிகிச்சைகளுக்கு நிதி உதவி வழங்குகிறது."
+    }
+}
+
+
+def welcome_response(context_name: str, language: str) -> str:
+    """Welcome message for a greeting, naming the context in the user's language."""
+    welcome_responses = {
+        "en": f"Hello! Welcome to the {context_name.replace('_', ' ').title()} information service. How can I assist you today?",
+        "si": f"ආයුබෝවන්! {context_name.replace('_', ' ').title()} තොරතුරු සේවයට සාදරයෙන් පිළිගනිමු. අද මම ඔබට කෙසේ උපකාර කළ හැකිද?",
+        "ta": f"வணக்கம்! {context_name.replace('_', ' ').title()} தகவல் சேवைக்கு வரவேற்கிறோம். இன்று நான் உங்களுக்கு எப்படி உதவ முடியும்?"
+    }
+    return welcome_responses.get(language, welcome_responses["en"])
+
+
+def _phrases(words: list) -> list:
+    return [tuple(tokenize(word)) for word in words]
+
+
+_GREETING_PHRASES = {language: _phrases(words) for language, words in GREETINGS.items()}
+_COMMON_PHRASES = {
+    language: [(tuple(tokenize(keyword)), answer) for keyword, answer in answers.items()]
+    for language, answers in COMMON_QUESTIONS.items()
+}
+
+# Words a question may add to a canned phrase and still ask the canned question ("tell me
+# about the fund"); any other word ("what is the deadline", "can you help me apply") makes
+# it a question for the FAQ tiers
+_CANNED_FILLER = frozenset(tokenize(
+    "a an the is are this that it what of about me us you your i we can do does please tell more some "
+    "information info general president's presidents fund sri lanka service services chatbot offer provide"
+))
+
+
+def _contains(words: tuple, phrase: tuple) -> bool:
+    size = len(phrase)
+    return any(words[i:i + size] == phrase for i in range(len(words) - size + 1))
+
+
+def match_greeting(question: str, language: str) -> bool:
+    """True if the question contains a greeting as whole words ("hi" does not match "which")."""
+    words = tuple(tokenize(question))
+    return any(_contains(words, phrase) for phrase in _GREETING_PHRASES.get(language, _GREETING_PHRASES["en"]))
+
+
+def has_canned_answers(context_name: str) -> bool:
+    return (context_name or "").lower() in CANNED_CONTEXTS
+
+
+def common_answer(question: str, language: str) -> Optional[str]:
+    """
+    Canned answer whose keyword appears in the question as whole words, when every other
+    word of the question is filler (see _CANNED_FILLER); otherwise None.
+    Languages without canned answers give None.
+    """
+    phrases = _COMMON_PHRASES.get(language)
+    if not phrases:
+        return None
+    words = tuple(tokenize(question))
+    for phrase, answer in phrases:
+        if _contains(words, phrase) and all(word in phrase or word in _CANNED_FILLER for word in words):
+            return answer
+    return None
@@ -1,8 +1,117 @@
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    groq_api_key: str
+    groq_api_key: str = ""
     groq_model: str = "llama-3.3-70b-versatile"
+    # Override the Groq API endpoint, e.g. a local fake upstream for benchmarks
+    groq_base_url: str = ""
+
+    # LLM backend: "groq" for the real API, "stub" for offline load testing
+    llm_backend: str = "groq"
+    llm_max_concurrency: int = 16
+    llm_max_connections: int = 32
+    llm_max_keepalive_connections: int = 16
+    llm_connect_timeout: float = 5.0
+    llm_timeout: float = 30.0
+    llm_max_retries: int = 1
+    llm_stub_latency: float = 0.5
+    # Share one upstream call between identical concurrent questions
+    llm_coalesce_requests: bool = True
+    # Ordered fallback list "model[:timeout],..." (empty uses groq_model with llm_timeout)
+    llm_models: str = ""
+    # Circuit breaker: open a model after N consecutive failures, retry it after the cooldown
+    llm_breaker_failures: int = 5
+    llm_breaker_cooldown: float = 30.0
+    # Hedge to the next model once a call outlives this percentile of recent latencies (0 disables)
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_samples: int = 20
+    llm_latency_window: int = 200
+
+    # Latency budget for /chat in seconds from arrival (0 waits for the LLM); when it runs out, or the
+    # LLM call fails, the best local candidate (top FAQ match, keyword rule, else the context's
+    # fallback_answer) is returned marked degraded
+    answer_deadline: float = 0.0
+    # A FAQ match needs at least this score to be a candidate (keyword rule matches always are)
+    answer_deadline_faq_min_score: float = 0.2
+
+    # Admission control for LLM calls (FAQ/greeting answers and cache hits are never limited); off
+    # by default. Every /chat/batch item that calls the LLM is admitted like a /chat request
+    admission_enabled: bool = False
+    # Requests allowed to wait beyond llm_max_concurrency before answering 503
+    admission_max_queue: int = 64
+    # Per-client token bucket (API key, else IP); a rate of 0 disables it
+    admission_client_rate: float = 1.0
+    admission_client_burst: int = 20
+    admission_max_clients: int = 10000
+    # Key clients on the first X-Forwarded-For hop instead of the socket IP. Enable only behind a
+    # proxy that sets the header, otherwise every client of the proxy shares one bucket
+    admission_trust_forwarded_for: bool = False
+
+    # LLM answer cache (LRU + TTL, bounded by entry count and approximate bytes)
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 10000
+    answer_cache_max_bytes: int = 64 * 1024 * 1024
+    answer_cache_ttl: float = 600.0
+    # SQLite file shared by all workers on the host as a second cache level (empty disables)
+    answer_store_path: str = ""
+    answer_store_max_entries: int = 100000
+    answer_store_max_bytes: int = 256 * 1024 * 1024
+
+    # Prompt building: only the top-k context chunks relevant to the question
+    # are sent, within the token budget (0 sends the whole context)
+    prompt_top_k_chunks: int = 4
+    prompt_context_token_budget: int = 600
+    prompt_chunk_tokens: int = 120
+
+    # Server-side conversation sessions
+    session_max_sessions: int = 10000
+    session_idle_timeout: float = 1800.0
+    session_history_token_budget: int = 1000
+    session_summary_token_budget: int = 200
+
+    # Request limits for /chat, /chat/stream and /chat/batch items (oversized bodies get 413)
+    chat_max_body_bytes: int = 64 * 1024
+    chat_max_question_chars: int = 2000
+    chat_max_history_messages: int = 50
+    chat_max_history_message_chars: int = 4000
+
+    # /chat/ws: open sockets per worker (0 is unlimited) and seconds without a question before closing
+    ws_max_connections: int = 1000
+    ws_idle_timeout: float = 300.0
+
+    # /chat/batch
+    batch_max_items: int = 500
+    batch_max_concurrency: int = 8
+
+    # Moderation word list (one term per line); empty uses app/data/bad_words.txt
+    moderation_words_file: str = ""
+
+    # Query log: one JSONL line per answered question, written in batches off the request
+    # path (empty disables); mine it with python -m app.faq_miner
+    query_log_path: str = ""
+    query_log_batch_size: int = 256
+    query_log_flush_interval: float = 1.0
+    # Records waiting for the writer; beyond this new records are dropped and counted
+    query_log_max_pending: int = 10000
+
+    # Compiled FAQ and prompt-chunk indexes (python -m app.knowledge build); empty uses app/data/knowledge.bin
+    knowledge_file: str = ""
+
+    # Intent classifier (python -m app.intent train); empty uses app/data/intent_model.json
+    intent_model_file: str = ""
+    intent_min_confidence: float = 0.6
+    # When the FAQ handler and keyword rules miss, a confident FAQ intent may answer from the
+    # best FAQ match down to this retrieval score
+    intent_faq_confidence: float = 0.8
+    intent_faq_min_score: float = 0.3
+
+    # Context data files (one JSON file per context and language); empty uses app/contexts/data
+    contexts_dir: str = ""
+    # Contexts are loaded on first use and the least recently used dropped beyond this estimated size
+    context_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Poll context files for changes every N seconds (0 disables hot reload)
+    context_reload_interval: float = 0.0
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,121 @@
+"""
+Generic context engine. A context is a JSON data file per language in
+app/contexts/data (presidents_fund.json, presidents_fund_si.json, ...):
+
+    system_prompt, context_info   prompt text sent with LLM questions
+    faqs                          [{"question", "answer" | "answers"}]
+    keyword_rules                 [{"keywords", "answer", "related_faqs"}], scored together
+                                  when no FAQ matches (see app/keyword_rules.py)
+    general_keywords              words that get general_answer when no rule matches
+    general_answer
+    not_found_answer              the reply when nothing matches at all
+    fallback_answer               the reply when an LLM-bound question misses its deadline
+                                  and no FAQ or keyword rule is close enough
+
+Every file is served by the same Context class, so FAQ matching is written
+once instead of being copied into each language module.
+"""
+import json
+import os
+from array import array
+from functools import partial
+from types import MappingProxyType
+from typing import Optional
+
+from app.config import settings
+from app.keyword_rules import KeywordMatch, KeywordRules
+from app.knowledge import faq_index_for, prompt_index_for
+from app.prompt import PromptChunks
+
+# Python objects take several times the UTF-8 size of the JSON they are parsed from
+_OBJECT_OVERHEAD = 4
+# Bytes per gram in an in-process vocabulary dict (key string and dict slot)
+_VOCAB_ENTRY_BYTES = 120
+
+
+def index_bytes(index) -> int:
+    """Approximate private memory of an NgramIndex; arrays mapped from the knowledge artifact count as shared."""
+    total = 0
+    for name in ("df", "idf", "post_offsets", "postings", "doc_offsets", "forward_grams", "forward_weights"):
+        values = getattr(index, name)
+        if isinstance(values, array):
+            total += values.itemsize * len(values)
+    if isinstance(index.vocab, dict):
+        total += _VOCAB_ENTRY_BYTES * len(index.vocab)
+    return total
+
+
+class Context:
+    """One context data file: prompt, FAQs and keyword rules for a single language."""
+
+    def __init__(self, name: str, data: dict, source_bytes: int = 0):
+        self.name = name
+        self.context = MappingProxyType(data)
+        faqs = data.get("faqs") or []
+        self.faq_index = faq_index_for(name, faqs) if faqs else None
+        self.keyword_rules = KeywordRules(
+            data.get("keyword_rules", []), data.get("general_keywords", ()), data.get("general_answer")
+        )
+        self.not_found_answer = data.get("not_found_answer")
+        self.fallback_answer = data.get("fallback_answer")
+        self.prompt = PromptChunks(data, settings.prompt_chunk_tokens, partial(prompt_index_for, name))
+        self.nbytes = source_bytes * _OBJECT_OVERHEAD + index_bytes(self.prompt.index)
+        if self.faq_index is not None:
+            self.nbytes += index_bytes(self.faq_index.index)
+
+    @classmethod
+    def from_file(cls, name: str, path: str) -> "Context":
+        with open(path, "rb") as f:
+            raw = f.read()
+        return cls(name, json.loads(raw), len(raw))
+
+    @property
+    def answers_locally(self) -> bool:
+        """Whether the context has FAQs or keyword rules (otherwise every question goes to the LLM)."""
+        return self.faq_index is not None or bool(self.keyword_rules)
+
+    def get_faq_answer(self, user_question: str) -> Optional[str]:
+        """
+        Returns the best matching FAQ answer for a user's question.
+        Uses both FAQ index matching and keyword-based context matching.
+        """
+        match = self.get_faq_match(user_question)
+        return match.answer if match is not None else None
+
+    def get_faq_match(self, user_question: str) -> Optional[KeywordMatch]:
+        """get_faq_answer's answer, with the related FAQ questions when a keyword rule gave it."""
+        if self.faq_index is not None:
+            answer = self.faq_index.best_answer(user_question)
+            if answer:
+                return KeywordMatch(answer, (), 0)
+        match = self.keyword_rules.match(user_question.lower())
+        if match is not None:
+            return match
+        return KeywordMatch(self.not_found_answer, (), 0) if self.not_found_answer else None
+
+    def search_faqs(self, user_question: str, k: int = 3) -> list:
+        """Returns the top-k (faq, score) matches for a user's question."""
+        return self.faq_index.search(user_question, k) if self.faq_index is not None else []
+
+    def match_keywords(self, user_question: str) -> Optional[KeywordMatch]:
+        """The best keyword rule's answer and related FAQ questions, else general guidance, else None."""
+        return self.keyword_rules.match(user_question)
+
+    def get_contextual_answer(self, user_question: str) -> Optional[str]:
+        """Answer from the best scoring keyword rule, else general guidance, else not_found_answer."""
+        match = self.keyword_rules.match(user_question)
+        return match.answer if match is not None else self.not_found_answer
+
+
+def read_context_file(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def context_files(directory: str) -> dict:
+    """File stem -> path of every context data file in directory."""
+    return {
+        entry.name[:-5]: entry.path
+        for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.endswith(".json")
+    }
@@ -0,0 +1,186 @@
+import os
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from app.config import settings
+from app.contexts.engine import Context, context_files
+from app.keyword_rules import KeywordMatch
+from app.prompt import PromptChunks
+
+LANGUAGES = ("en", "si", "ta")
+LANGUAGE_SUFFIXES = {"en": "", "si": "_si", "ta": "_ta"}
+DEFAULT_CONTEXT = "default"
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def _base_name(name: str) -> str:
+    """Context name of a data file: the stem without its language suffix."""
+    for suffix in LANGUAGE_SUFFIXES.values():
+        if suffix and name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class ContextEntry(NamedTuple):
+    name: str
+    language: str
+    context: MappingProxyType
+    faq_handler: Optional[Callable[[str], Optional[KeywordMatch]]]
+    faq_search: Optional[Callable[[str, int], list]]
+    keyword_search: Optional[Callable[[str], Optional[KeywordMatch]]]
+    fallback_answer: Optional[str]
+    fallback_chain: Tuple[str, ...]
+    prompt: PromptChunks
+
+
+class ContextRegistry:
+    """
+    Lookup of (context, language) pairs over the context data files.
+
+    load() only lists the data directory; a file is parsed and its FAQ index
+    and prompt chunks built the first time a request needs it. Loaded contexts
+    are kept in least-recently-used order and the oldest are dropped once their
+    estimated size exceeds max_bytes, so memory stays flat however many
+    contexts exist. reload_if_changed() drops contexts whose file was added,
+    removed or modified.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DATA_DIR, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._files: Dict[str, str] = {}
+        self._base_names = frozenset()
+        self._mtimes: Dict[str, int] = {}
+        self._contexts: "OrderedDict[str, Context]" = OrderedDict()
+        self._entries: Dict[Tuple[str, str], ContextEntry] = {}
+        self._bytes = 0
+        self._loaded = False
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def _scan(self) -> Dict[str, int]:
+        return {name: os.stat(path).st_mtime_ns for name, path in context_files(self.directory).items()}
+
+    def _set_files(self, mtimes: Dict[str, int]):
+        self._files = {name: os.path.join(self.directory, f"{name}.json") for name in mtimes}
+        self._base_names = frozenset(_base_name(name) for name in self._files if name != DEFAULT_CONTEXT)
+        self._mtimes = mtimes
+        self._loaded = True
+
+    def load(self):
+        """List the context data files; contexts themselves are loaded on first use."""
+        self._set_files(self._scan())
+
+    def reload_if_changed(self) -> bool:
+        """Forget contexts whose data file changed. Returns True if anything changed."""
+        mtimes = self._scan()
+        if mtimes == self._mtimes:
+            return False
+        changed = {name for name in set(mtimes) | set(self._mtimes) if mtimes.get(name) != self._mtimes.get(name)}
+        for name in changed:
+            self._drop(name)
+        self._set_files(mtimes)
+        self._entries.clear()
+        return True
+
+    def _drop(self, name: str):
+        context = self._contexts.pop(name, None)
+        if context is not None:
+            self._bytes -= context.nbytes
+
+    def _context(self, name: str) -> Context:
+        context = self._contexts.get(name)
+        if context is not None:
+            self._contexts.move_to_end(name)
+            return context
+        started = time.perf_counter()
+        context = Context.from_file(name, self._files[name])
+        self.load_seconds += time.perf_counter() - started
+        self.loads += 1
+        self._contexts[name] = context
+        self._bytes += context.nbytes
+        while self._bytes > self.max_bytes and len(self._contexts) > 1:
+            _, evicted = self._contexts.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+            # Cached entries may point at the evicted context
+            self._entries.clear()
+        return context
+
+    def context(self, name: str) -> Optional[Context]:
+        """The loaded context of one data file (e.g. 'presidents_fund_si'), or None if there is no such file."""
+        if not self._loaded:
+            self.load()
+        return self._context(name) if name in self._files else None
+
+    def _entry(self, key: str, language: str) -> ContextEntry:
+        suffix = LANGUAGE_SUFFIXES[language]
+        chain = tuple(dict.fromkeys(
+            [candidate for candidate in (f"{key}{suffix}", key) if candidate in self._files] + [DEFAULT_CONTEXT]
+        ))
+        primary = self._context(chain[0])
+        # FAQ matching is language specific, so only the exact file's matcher is used
+        exact = f"{key}{suffix}"
+        faq_context = self._context(exact) if key != DEFAULT_CONTEXT and exact in self._files else None
+        if faq_context is not None and not faq_context.answers_locally:
+            faq_context = None
+        return ContextEntry(
+            name=key,
+            language=language,
+            context=primary.context,
+            faq_handler=faq_context.get_faq_match if faq_context is not None else None,
+            faq_search=faq_context.search_faqs if faq_context is not None else None,
+            keyword_search=faq_context.match_keywords if faq_context is not None else None,
+            fallback_answer=primary.fallback_answer or self._context(DEFAULT_CONTEXT).fallback_answer,
+            fallback_chain=chain,
+            prompt=primary.prompt,
+        )
+
+    def get(self, context_name: Optional[str], language: Optional[str] = "en") -> ContextEntry:
+        if not self._loaded:
+            self.load()
+        key = (context_name or "").lower()
+        if key not in self._base_names:
+            key = DEFAULT_CONTEXT
+        if language not in LANGUAGE_SUFFIXES:
+            # Unknown languages use the English context without FAQ matching
+            return self.get(key, "en")._replace(
+                language=language, faq_handler=None, faq_search=None, keyword_search=None
+            )
+        entry = self._entries.get((key, language))
+        if entry is None:
+            entry = self._entries[(key, language)] = self._entry(key, language)
+        else:
+            # Keep the contexts behind a cached entry fresh in the LRU
+            for name in entry.fallback_chain:
+                if name in self._contexts:
+                    self._contexts.move_to_end(name)
+        return entry
+
+    @property
+    def context_names(self) -> Tuple[str, ...]:
+        """Every context data file except the default one."""
+        if not self._loaded:
+            self.load()
+        return tuple(sorted(name for name in self._files if name != DEFAULT_CONTEXT))
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._files),
+            "loaded": len(self._contexts),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "load_seconds": round(self.load_seconds, 3),
+        }
+
+
+registry = ContextRegistry(
+    directory=settings.contexts_dir or DEFAULT_DATA_DIR,
+    max_bytes=settings.context_cache_max_bytes,
+)
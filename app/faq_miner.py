@@ -0,0 +1,172 @@
+"""
+Offline FAQ-promotion miner over the query log (QUERY_LOG_PATH).
+
+Groups the questions that were answered by the LLM per (context, language),
+clusters near-duplicates with the FAQ retrieval index (character trigram
+TF-IDF, cosine similarity) and ranks the clusters by how many LLM calls a
+matching FAQ entry would have saved:
+
+    python -m app.faq_miner queries.jsonl
+    python -m app.faq_miner queries.jsonl --min-count 5 --top 10 --output faq_candidates.json
+
+Each candidate names the context data file it belongs in (e.g. presidents_fund_si),
+the most frequent phrasing as its question, the latest LLM answer as a draft
+answer and the closest existing FAQ, so a reviewer can tell a new entry from a
+rephrasing the FAQ tier missed. Questions in the log are normalized (lowercase,
+no punctuation) and answers are LLM output: edit both before adding them to
+the file's faqs.
+"""
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+from app.querylog import read_log
+from app.retrieval import NgramIndex
+
+
+class QuestionStats:
+    __slots__ = ("count", "tokens", "answer", "answered_at")
+
+    def __init__(self):
+        self.count = 0
+        self.tokens = 0
+        self.answer = None
+        self.answered_at = 0.0
+
+    def add(self, record: dict):
+        self.count += 1
+        self.tokens += record.get("prompt_tokens", 0) + record.get("completion_tokens", 0)
+        if record.get("answer") and record.get("ts", 0.0) >= self.answered_at:
+            self.answer = record["answer"]
+            self.answered_at = record.get("ts", 0.0)
+
+
+def llm_questions(records: Iterable[dict]) -> Dict[tuple, Dict[str, QuestionStats]]:
+    """Per (context, language), the questions answered by the LLM and their stats."""
+    groups = defaultdict(lambda: defaultdict(QuestionStats))
+    for record in records:
+        if record.get("tier") != "llm" or not record.get("question"):
+            continue
+        groups[(record.get("context") or "default", record.get("language") or "en")][record["question"]].add(record)
+    return groups
+
+
+def cluster(questions: Dict[str, QuestionStats], similarity: float) -> List[List[str]]:
+    """
+    Greedy clustering, most asked first: each question not yet clustered starts a
+    cluster and takes every unclustered question at least `similarity` close to it.
+    """
+    ordered = sorted(questions, key=lambda q: (-questions[q].count, q))
+    index = NgramIndex(ordered, max_candidates=256)
+    assigned = [False] * len(ordered)
+    clusters = []
+    for doc_id, question in enumerate(ordered):
+        if assigned[doc_id]:
+            continue
+        assigned[doc_id] = True
+        members = [question]
+        for other_id, score in index.search(question, k=len(ordered)):
+            if score < similarity:
+                break
+            if not assigned[other_id]:
+                assigned[other_id] = True
+                members.append(ordered[other_id])
+        clusters.append(members)
+    return clusters
+
+
+def module_name(context: str, language: str) -> str:
+    from app.contexts.registry import LANGUAGE_SUFFIXES
+
+    return context + LANGUAGE_SUFFIXES.get(language, "")
+
+
+def nearest_faq(context: str, language: str, question: str):
+    """(question, score) of the closest FAQ already in the context, or (None, 0.0)."""
+    from app.contexts.registry import registry
+
+    faq_search = registry.get(context, language).faq_search
+    matches = faq_search(question, 1) if faq_search is not None else []
+    if not matches:
+        return None, 0.0
+    faq, score = matches[0]
+    return faq["question"], round(score, 3)
+
+
+def mine(records: Iterable[dict], similarity: float = 0.6, min_count: int = 3, check_faqs: bool = True) -> List[dict]:
+    """FAQ candidates ranked by the LLM requests they would have answered, then by tokens."""
+    groups = llm_questions(records)
+    total_requests = sum(stats.count for questions in groups.values() for stats in questions.values()) or 1
+    candidates = []
+    for (context, language), questions in groups.items():
+        for members in cluster(questions, similarity):
+            requests = sum(questions[q].count for q in members)
+            if requests < min_count:
+                continue
+            answered = [questions[q] for q in members if questions[q].answer]
+            candidate = {
+                "module": module_name(context, language),
+                "context": context,
+                "language": language,
+                "question": members[0],
+                "answer": max(answered, key=lambda s: s.answered_at).answer if answered else "",
+                "llm_requests": requests,
+                "llm_tokens": sum(questions[q].tokens for q in members),
+                "traffic_share": round(requests / total_requests, 4),
+                "variants": members[1:6],
+            }
+            if check_faqs:
+                candidate["nearest_faq"], candidate["nearest_faq_score"] = nearest_faq(context, language, members[0])
+            candidates.append(candidate)
+    candidates.sort(key=lambda c: (-c["llm_requests"], -c["llm_tokens"], c["question"]))
+    return candidates
+
+
+def by_module(candidates: Sequence[dict]) -> Dict[str, list]:
+    """Candidates grouped per context data file, as {"question", "answer"} FAQ entries plus their stats."""
+    modules = defaultdict(list)
+    for candidate in candidates:
+        modules[candidate["module"]].append({k: v for k, v in candidate.items() if k not in ("module", "context", "language")})
+    return dict(modules)
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.faq_miner",
+                                     description="Rank frequent LLM-answered questions as FAQ candidates")
+    parser.add_argument("log", nargs="+", help="query log file(s) written with QUERY_LOG_PATH")
+    parser.add_argument("--similarity", type=float, default=0.6,
+                        help="cosine similarity for two phrasings to count as the same question")
+    parser.add_argument("--min-count", type=int, default=3, help="ignore clusters asked fewer times")
+    parser.add_argument("--top", type=int, default=20, help="candidates to print")
+    parser.add_argument("--output", help="write every candidate, grouped by context data file, to this JSON file")
+    parser.add_argument("--no-faq-check", action="store_true", help="do not look up the closest existing FAQ")
+    args = parser.parse_args(argv)
+
+    records = [record for path in args.log for record in read_log(path)]
+    tiers = Counter(record.get("tier") for record in records)
+    llm_total = tiers.get("llm", 0)
+    print(f"{len(records)} logged questions, {llm_total} answered by the LLM "
+          f"({llm_total / (len(records) or 1):.1%})")
+
+    candidates = mine(records, similarity=args.similarity, min_count=args.min_count,
+                      check_faqs=not args.no_faq_check)
+    covered = sum(candidate["llm_requests"] for candidate in candidates)
+    print(f"{len(candidates)} FAQ candidates would have answered {covered} LLM requests "
+          f"({covered / (llm_total or 1):.1%} of LLM traffic)\n")
+    for rank, candidate in enumerate(candidates[:args.top], 1):
+        nearest = ""
+        if candidate.get("nearest_faq"):
+            nearest = f"  (closest FAQ {candidate['nearest_faq_score']:.2f}: {candidate['nearest_faq'][:60]})"
+        print(f"{rank:>3}. {candidate['module']:<22}{candidate['llm_requests']:>6} req {candidate['llm_tokens']:>8} tok  "
+              f"{candidate['question'][:70]}{nearest}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(by_module(candidates), f, ensure_ascii=False, indent=2)
+        print(f"\nCandidates written to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
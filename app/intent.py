@@ -0,0 +1,209 @@
+"""
+Local intent classifier that routes a question before any answering tier runs.
+
+A multinomial Naive Bayes model over character trigrams and words, trained
+offline from the context FAQs, q-and-a.txt and app/data/intent_examples.json:
+
+    python -m app.intent train            # writes app/data/intent_model.json
+    python -m app.intent predict "hi, how do I apply?"
+
+At serving time predict() is a handful of dict lookups per question.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.text import char_ngrams, tokenize
+
+LABELS = ("greeting", "canned", "faq", "llm")
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_MODEL_FILE = os.path.join(DATA_DIR, "intent_model.json")
+DEFAULT_EXAMPLES_FILE = os.path.join(DATA_DIR, "intent_examples.json")
+QA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "q-and-a.txt")
+
+MODEL_VERSION = 1
+
+
+def features(text: str) -> List[str]:
+    """Character trigrams of every word plus the words themselves (prefixed 'w:')."""
+    return char_ngrams(text) + ["w:" + word for word in tokenize(text)]
+
+
+class IntentClassifier:
+    """
+    Multinomial Naive Bayes with Laplace smoothing.
+    log_probs maps a feature to its per-label log P(feature | label); features
+    never seen in training use unseen[label].
+    """
+
+    def __init__(self, labels: Sequence[str], priors: Sequence[float], unseen: Sequence[float],
+                 log_probs: Dict[str, Sequence[float]]):
+        self.labels = tuple(labels)
+        self.priors = tuple(priors)
+        self.unseen = tuple(unseen)
+        self.log_probs = {feature: tuple(values) for feature, values in log_probs.items()}
+
+    @classmethod
+    def train(cls, examples: Dict[str, Iterable[str]], alpha: float = 0.5) -> "IntentClassifier":
+        labels = [label for label in LABELS if label in examples]
+        counts = {label: Counter() for label in labels}
+        documents = {label: 0 for label in labels}
+        for label in labels:
+            for text in examples[label]:
+                counts[label].update(features(text))
+                documents[label] += 1
+
+        vocabulary = set().union(*counts.values())
+        total_documents = sum(documents.values())
+        priors, unseen, denominators = [], [], []
+        for label in labels:
+            denominator = sum(counts[label].values()) + alpha * (len(vocabulary) + 1)
+            denominators.append(denominator)
+            priors.append(math.log(documents[label] / total_documents))
+            unseen.append(math.log(alpha / denominator))
+        log_probs = {
+            feature: [
+                round(math.log((counts[label][feature] + alpha) / denominator), 5)
+                for label, denominator in zip(labels, denominators)
+            ]
+            for feature in sorted(vocabulary)
+        }
+        return cls(labels, priors, unseen, log_probs)
+
+    def scores(self, text: str) -> Tuple[List[float], float]:
+        """Unnormalized per-label log scores and the share of the text's features seen in training."""
+        totals = list(self.priors)
+        n = len(totals)
+        unseen = self.unseen
+        log_probs = self.log_probs
+        text_features = features(text)
+        known = 0
+        for feature in text_features:
+            values = log_probs.get(feature)
+            if values is None:
+                values = unseen
+            else:
+                known += 1
+            for i in range(n):
+                totals[i] += values[i]
+        return totals, known / len(text_features) if text_features else 0.0
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Most likely label and a confidence in [0, 1]: the posterior probability
+        scaled by feature coverage, so text unlike anything in training scores low.
+        """
+        totals, coverage = self.scores(text)
+        best = max(range(len(totals)), key=totals.__getitem__)
+        top = totals[best]
+        normalizer = sum(math.exp(score - top) for score in totals)
+        return self.labels[best], coverage / normalizer
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_VERSION,
+            "labels": list(self.labels),
+            "priors": list(self.priors),
+            "unseen": list(self.unseen),
+            "log_probs": {feature: list(values) for feature, values in self.log_probs.items()},
+        }
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported intent model version {data.get('version')!r} in {path}")
+        return cls(data["labels"], data["priors"], data["unseen"], data["log_probs"])
+
+
+def load_classifier(path: str = "") -> Optional[IntentClassifier]:
+    """Load the trained model, or None if there is none (routing then falls back to phrase matching)."""
+    path = path or DEFAULT_MODEL_FILE
+    if not os.path.exists(path):
+        return None
+    return IntentClassifier.load(path)
+
+
+def context_faq_questions() -> List[str]:
+    """FAQ questions of every context data file."""
+    from app.contexts.engine import context_files, read_context_file
+    from app.contexts.registry import registry
+
+    questions = []
+    for _, path in sorted(context_files(registry.directory).items()):
+        questions.extend(faq["question"] for faq in read_context_file(path).get("faqs", []))
+    return questions
+
+
+def qa_questions(path: str = QA_FILE) -> List[str]:
+    """First line of every blank-line separated block in q-and-a.txt."""
+    if not os.path.exists(path):
+        return []
+    questions, block = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in list(f) + [""]:
+            line = line.strip()
+            if line and not line.startswith("="):
+                block.append(line)
+                continue
+            if len(block) >= 2:
+                questions.append(block[0])
+            block = []
+    return questions
+
+
+def training_examples(examples_path: str = DEFAULT_EXAMPLES_FILE, qa_path: str = QA_FILE) -> Dict[str, List[str]]:
+    with open(examples_path, encoding="utf-8") as f:
+        examples = {label: list(texts) for label, texts in json.load(f).items()}
+    examples.setdefault("faq", []).extend(context_faq_questions() + qa_questions(qa_path))
+    unknown = set(examples) - set(LABELS)
+    if unknown:
+        raise ValueError(f"Unknown intent labels in {examples_path}: {sorted(unknown)}")
+    return examples
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.intent", description="Train or try the intent classifier")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser("train", help="train from the context FAQs, q-and-a.txt and the example file")
+    train.add_argument("--examples", default=DEFAULT_EXAMPLES_FILE)
+    train.add_argument("--qa-file", default=QA_FILE)
+    train.add_argument("--output", default=settings.intent_model_file or DEFAULT_MODEL_FILE)
+    train.add_argument("--alpha", type=float, default=0.5, help="Laplace smoothing")
+    predict = commands.add_parser("predict", help="classify questions with the trained model")
+    predict.add_argument("questions", nargs="+")
+    predict.add_argument("--model", default=settings.intent_model_file or DEFAULT_MODEL_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        examples = training_examples(args.examples, args.qa_file)
+        classifier = IntentClassifier.train(examples, alpha=args.alpha)
+        classifier.save(args.output)
+        correct = sum(
+            classifier.predict(text)[0] == label for label, texts in examples.items() for text in texts
+        )
+        total = sum(len(texts) for texts in examples.values())
+        sizes = ", ".join(f"{label}={len(texts)}" for label, texts in examples.items())
+        print(f"Trained on {total} examples ({sizes}); {len(classifier.log_probs)} features; "
+              f"training accuracy {correct / total:.1%}")
+        print(f"Model written to {args.output}")
+    else:
+        classifier = IntentClassifier.load(args.model)
+        for question in args.questions:
+            label, confidence = classifier.predict(question)
+            print(f"{label:<9} {confidence:.3f}  {question}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.automaton import Automaton
+from app.text import fold_text
+
+
+class KeywordMatch(NamedTuple):
+    answer: str
+    related_faqs: Tuple[str, ...]
+    score: int
+
+
+class KeywordRules:
+    """
+    A context's keyword rules compiled into one Aho-Corasick automaton.
+
+    Every keyword of every rule (and the general keywords) is a pattern of the
+    same automaton, so match() scans the question once whatever the number of
+    rules. Each rule scores the total length of its distinct keywords found in
+    the question, so a specific phrase ("who can apply") beats a shorter
+    keyword of another rule ("apply"); ties go to the earlier rule. Matching
+    is on folded text (see app.text.fold_text) and keywords match anywhere in
+    a word, which keeps Sinhala and Tamil inflections matching their stem.
+    """
+
+    def __init__(self, rules: Sequence[dict], general_keywords: Iterable[str] = (), general_answer: str = None):
+        self._rules: List[KeywordMatch] = []
+        self._keyword_rules: Dict[str, List[int]] = {}
+        for rule_id, rule in enumerate(rules):
+            self._rules.append(KeywordMatch(rule["answer"], tuple(rule.get("related_faqs", ())), 0))
+            for keyword in rule["keywords"]:
+                keyword = fold_text(keyword).strip()
+                if not keyword:
+                    continue
+                rule_ids = self._keyword_rules.setdefault(keyword, [])
+                if rule_id not in rule_ids:
+                    rule_ids.append(rule_id)
+        self._general = frozenset(filter(None, (fold_text(keyword).strip() for keyword in general_keywords)))
+        self.general_answer = general_answer
+        self.automaton = Automaton(list(self._keyword_rules) + sorted(self._general))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def match(self, question: str) -> Optional[KeywordMatch]:
+        """The best scoring rule's answer and related FAQs, else the general answer, else None."""
+        found = {keyword for _, keyword in self.automaton.find_all(fold_text(question))}
+        if not found:
+            return None
+        scores: Dict[int, int] = {}
+        for keyword in found:
+            for rule_id in self._keyword_rules.get(keyword, ()):
+                scores[rule_id] = scores.get(rule_id, 0) + len(keyword)
+        if scores:
+            rule_id = min(scores, key=lambda r: (-scores[r], r))
+            return self._rules[rule_id]._replace(score=scores[rule_id])
+        if self.general_answer and not found.isdisjoint(self._general):
+            return KeywordMatch(self.general_answer, (), 0)
+        return None
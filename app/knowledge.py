@@ -0,0 +1,322 @@
+"""
+Compiled knowledge artifact: the FAQ lookup index and the prompt-chunk index
+of every context data file in one versioned binary file that workers
+memory-map read-only.
+
+    python -m app.knowledge build        # writes app/data/knowledge.bin
+    python -m app.knowledge info
+
+Layout (native byte order, recorded in the metadata; sections 8-byte aligned):
+
+    magic  b"GOVKB\\0\\0\\0"
+    u32    format version
+    u32    metadata length
+    JSON   metadata: per index ("<module>/faqs" or "<module>/prompt") the
+           fingerprint of its documents, index parameters and (offset, byte
+           length, typecode) of each array section
+    ...    array sections
+
+Each index's arrays are memoryviews into the shared mapping, so the pages are
+shared between uvicorn workers and opening the file costs the same whatever
+the size of the knowledge base. The gram vocabulary is stored as an
+open-addressing hash table (crc32 of the UTF-8 gram) so lookups need no
+per-process dict either.
+
+Contexts ask for their indexes with faq_index_for() and prompt_index_for();
+when the artifact is missing or was built from other FAQ questions or prompt
+chunks (context_info, FAQs or PROMPT_CHUNK_TOKENS changed) the index is
+built in process as before.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import Dict, Optional, Sequence
+
+from app.config import settings
+from app.prompt import prompt_chunks
+from app.retrieval import FaqIndex, NgramIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GOVKB\0\0\0"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<8sII")
+_ALIGN = 8
+
+DEFAULT_KNOWLEDGE_FILE = os.path.join(os.path.dirname(__file__), "data", "knowledge.bin")
+
+# NgramIndex attribute -> array typecode, in file order
+_ARRAYS = (
+    ("df", "I"),
+    ("idf", "f"),
+    ("post_offsets", "I"),
+    ("postings", "I"),
+    ("doc_offsets", "I"),
+    ("forward_grams", "I"),
+    ("forward_weights", "f"),
+)
+
+
+# Index kinds per context data file: FAQ questions and prompt chunks
+INDEX_KINDS = ("faqs", "prompt")
+
+
+def fingerprint(documents: Sequence[str], n: int = 3) -> str:
+    """Identifies the documents (FAQ questions or prompt chunks) and gram size an index was built from."""
+    payload = json.dumps([n, list(documents)], ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class GramTable:
+    """
+    Read-only gram -> gram id lookup over three buffers: the UTF-8 grams
+    concatenated in id order, their offsets and a power-of-two slot table
+    holding gram ids (-1 for empty slots).
+    """
+
+    def __init__(self, blob, offsets, slots):
+        self.blob = blob
+        self.offsets = offsets
+        self.slots = slots
+        self.mask = len(slots) - 1
+
+    @staticmethod
+    def build(grams: Sequence[str]):
+        """Return (blob, offsets, slots) for grams, where a gram's id is its position."""
+        encoded = [gram.encode("utf-8") for gram in grams]
+        offsets = array("I", [0])
+        for gram in encoded:
+            offsets.append(offsets[-1] + len(gram))
+        capacity = 8
+        while capacity < 2 * len(encoded):
+            capacity *= 2
+        slots = array("i", [-1]) * capacity
+        mask = capacity - 1
+        for gram_id, gram in enumerate(encoded):
+            slot = zlib.crc32(gram) & mask
+            while slots[slot] != -1:
+                slot = (slot + 1) & mask
+            slots[slot] = gram_id
+        return b"".join(encoded), offsets, slots
+
+    def get(self, gram: str, default=None) -> Optional[int]:
+        encoded = gram.encode("utf-8")
+        slots, offsets, mask = self.slots, self.offsets, self.mask
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            gram_id = slots[slot]
+            if gram_id == -1:
+                return default
+            if self.blob[offsets[gram_id]:offsets[gram_id + 1]] == encoded:
+                return gram_id
+            slot = (slot + 1) & mask
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class KnowledgeBase:
+    """An opened artifact. Index arrays stay valid until close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._indexes: Dict[str, NgramIndex] = {}
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, meta_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a knowledge artifact")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported knowledge artifact version {version} in {path}")
+        self.metadata = json.loads(bytes(self._view[_HEADER.size:_HEADER.size + meta_length]))
+        if self.metadata["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was built on a {self.metadata['byteorder']}-endian machine")
+
+    def _section(self, spec) -> memoryview:
+        offset, length, typecode = spec
+        return self._view[offset:offset + length].cast(typecode)
+
+    def index(self, module: str, kind: str, documents: Sequence[str]) -> Optional[NgramIndex]:
+        """The module's compiled index of a kind, or None if it is missing or built from other documents."""
+        key = f"{module}/{kind}"
+        entry = self.metadata["indexes"].get(key)
+        if entry is None or entry["fingerprint"] != fingerprint(documents, entry["n"]):
+            return None
+        index = self._indexes.get(key)
+        if index is None:
+            sections = entry["sections"]
+            vocab = GramTable(self._section(sections["grams"]), self._section(sections["gram_offsets"]),
+                              self._section(sections["gram_slots"]))
+            index = self._indexes[key] = NgramIndex.from_arrays(
+                n=entry["n"],
+                size=entry["size"],
+                vocab=vocab,
+                **{name: self._section(sections[name]) for name, _ in _ARRAYS}
+            )
+        return index
+
+    def faq_index(self, module: str, questions: Sequence[str]) -> Optional[NgramIndex]:
+        return self.index(module, "faqs", questions)
+
+    def prompt_index(self, module: str, chunks: Sequence[str]) -> Optional[NgramIndex]:
+        return self.index(module, "prompt", chunks)
+
+    def close(self):
+        self._indexes.clear()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+
+
+def load_knowledge(path: str = "") -> Optional[KnowledgeBase]:
+    """Open the artifact, or None if it has not been built (or cannot be read)."""
+    path = path or DEFAULT_KNOWLEDGE_FILE
+    if not os.path.exists(path):
+        return None
+    try:
+        return KnowledgeBase(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring knowledge artifact %s: %s", path, e)
+        return None
+
+
+knowledge_base = load_knowledge(settings.knowledge_file)
+
+
+def _compiled_index(module: str, kind: str, documents: Sequence[str]) -> Optional[NgramIndex]:
+    if knowledge_base is None:
+        return None
+    index = knowledge_base.index(module, kind, documents)
+    if index is None:
+        logger.info("Knowledge artifact has no current %s index for %s; building it in process", kind, module)
+    return index
+
+
+def faq_index_for(module_name: str, faqs: Sequence[dict], min_score: float = 0.5) -> FaqIndex:
+    """FaqIndex for a context, backed by the compiled artifact when it is current."""
+    module = module_name.rsplit(".", 1)[-1]
+    index = _compiled_index(module, "faqs", [faq["question"] for faq in faqs])
+    return FaqIndex(faqs, min_score=min_score, index=index)
+
+
+def prompt_index_for(module_name: str, chunks: Sequence[str]) -> NgramIndex:
+    """NgramIndex over a context's prompt chunks, from the compiled artifact when it is current."""
+    module = module_name.rsplit(".", 1)[-1]
+    index = _compiled_index(module, "prompt", chunks)
+    return index if index is not None else NgramIndex(chunks)
+
+
+def context_data() -> Dict[str, dict]:
+    """Every context data file, keyed by file stem."""
+    from app.contexts.engine import context_files, read_context_file
+    from app.contexts.registry import registry
+
+    return {name: read_context_file(path) for name, path in sorted(context_files(registry.directory).items())}
+
+
+def context_documents(context: dict, chunk_tokens: int) -> Dict[str, list]:
+    """The documents each index kind of a context is built from; a context without FAQs has no FAQ index."""
+    documents = {"prompt": prompt_chunks(context, chunk_tokens)}
+    if context.get("faqs"):
+        documents["faqs"] = [faq["question"] for faq in context["faqs"]]
+    return documents
+
+
+def build(path: str, contexts: Dict[str, dict], n: int = 3, chunk_tokens: int = None) -> dict:
+    """Compile the indexes of every context and write the artifact atomically. Returns the metadata."""
+    chunk_tokens = chunk_tokens or settings.prompt_chunk_tokens
+    sections = []  # (index key, name, typecode, bytes)
+    indexes = {}
+    for module, context in sorted(contexts.items()):
+        for kind, documents in sorted(context_documents(context, chunk_tokens).items()):
+            key = f"{module}/{kind}"
+            index = NgramIndex(documents, n=n)
+            grams = sorted(index.vocab, key=index.vocab.__getitem__)
+            blob, offsets, slots = GramTable.build(grams)
+            indexes[key] = {"fingerprint": fingerprint(documents, n), "n": n, "size": index.size,
+                            "documents": len(documents), "grams": len(grams), "sections": {}}
+            sections.append((key, "grams", "B", blob))
+            sections.append((key, "gram_offsets", "I", offsets.tobytes()))
+            sections.append((key, "gram_slots", "i", slots.tobytes()))
+            for name, typecode in _ARRAYS:
+                values = getattr(index, name)
+                if values.typecode != typecode:
+                    values = array(typecode, values)
+                sections.append((key, name, typecode, values.tobytes()))
+
+    metadata = {"format_version": FORMAT_VERSION, "built_at": int(time.time()), "byteorder": sys.byteorder,
+                "prompt_chunk_tokens": chunk_tokens, "indexes": indexes}
+
+    # Offsets depend on the metadata length, which depends on the offsets; iterate until stable
+    meta_length = 0
+    while True:
+        offset = _aligned(_HEADER.size + meta_length)
+        for key, name, typecode, data in sections:
+            indexes[key]["sections"][name] = [offset, len(data), typecode]
+            offset = _aligned(offset + len(data))
+        encoded = json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(encoded) <= meta_length:
+            break
+        meta_length = len(encoded)
+    encoded = encoded.ljust(meta_length)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, meta_length))
+        f.write(encoded)
+        for key, name, typecode, data in sections:
+            f.write(b"\0" * (indexes[key]["sections"][name][0] - f.tell()))
+            f.write(data)
+    # Workers that still map the old file keep reading the old inode
+    os.replace(tmp_path, path)
+    return metadata
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.knowledge", description="Build or inspect the knowledge artifact")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="compile the FAQ and prompt indexes of every context data file")
+    build_parser.add_argument("--output", default=settings.knowledge_file or DEFAULT_KNOWLEDGE_FILE)
+    info_parser = commands.add_parser("info", help="show what an artifact contains and whether it is current")
+    info_parser.add_argument("--path", default=settings.knowledge_file or DEFAULT_KNOWLEDGE_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        metadata = build(args.output, context_data())
+        size = os.path.getsize(args.output)
+        print(f"Compiled {len(metadata['indexes'])} indexes into {args.output} "
+              f"({size / 1024:.1f} KiB) in {(time.perf_counter() - started) * 1000:.0f} ms")
+    else:
+        kb = KnowledgeBase(args.path)
+        contexts = context_data()
+        print(f"{args.path}: format {kb.metadata['format_version']}, built "
+              f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(kb.metadata['built_at']))}")
+        for key, entry in sorted(kb.metadata["indexes"].items()):
+            module, kind = key.rsplit("/", 1)
+            documents = context_documents(contexts[module], settings.prompt_chunk_tokens).get(kind) \
+                if module in contexts else None
+            state = "current" if documents and kb.index(module, kind, documents) else "stale"
+            print(f"  {module:<24}{kind:<8}{entry['documents']:>6} docs{entry['grams']:>8} grams  {state}")
+        kb.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,433 @@
+import asyncio
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+import httpx
+from groq import APITimeoutError, AsyncGroq
+
+from app.config import settings
+from app.metrics import observe_llm_call, record_llm_usage
+from app.prompt import estimate_tokens
+
+_TIMEOUT_ERRORS = (asyncio.TimeoutError, APITimeoutError, httpx.TimeoutException)
+
+
+class LLMUnavailableError(RuntimeError):
+    """Every configured model has an open circuit breaker."""
+
+
+class ModelSpec(NamedTuple):
+    name: str
+    timeout: float
+
+
+def parse_models(spec: str, default_model: str, default_timeout: float) -> List[ModelSpec]:
+    """Parse "model[:timeout],..." in fallback order; an empty spec is the default model alone."""
+    models = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, timeout = item.rpartition(":") if ":" in item else (item, "", "")
+        try:
+            models.append(ModelSpec(name, float(timeout)) if timeout else ModelSpec(item, default_timeout))
+        except ValueError:
+            # A colon that is part of the model name
+            models.append(ModelSpec(item, default_timeout))
+    return models or [ModelSpec(default_model, default_timeout)]
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. Opens after `failures` failures in a row; after
+    `cooldown` seconds one trial call is let through (half-open), and its outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failure_threshold = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def ready(self) -> bool:
+        """Whether allow() would let a call through, without taking the half-open trial."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.trial_in_flight)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self.trial_in_flight:
+                self.opened += 1
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def release(self):
+        """The call ended without an outcome (cancelled), so a half-open trial may run again."""
+        self.trial_in_flight = False
+
+
+class LatencyTracker:
+    """Latencies of the last `window` successful calls, for percentile queries."""
+
+    def __init__(self, window: int):
+        self._samples = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ModelState:
+    def __init__(self, spec: ModelSpec):
+        self.spec = spec
+        self.breaker = CircuitBreaker(settings.llm_breaker_failures, settings.llm_breaker_cooldown)
+        # Whole-answer latency of complete() calls; drives the hedge delay and Retry-After estimates
+        self.latency = LatencyTracker(settings.llm_latency_window)
+        # Time to first token of streamed calls, kept apart because it says nothing about whole answers
+        self.first_token = LatencyTracker(settings.llm_latency_window)
+        self.calls = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedges_skipped = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call to this model is hedged, or None while there is too little data."""
+        if settings.llm_hedge_percentile <= 0 or len(self.latency) < settings.llm_hedge_min_samples:
+            return None
+        return self.latency.percentile(settings.llm_hedge_percentile)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.spec.name,
+            "timeout": self.spec.timeout,
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            "calls": self.calls,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "hedges_skipped": self.hedges_skipped,
+            "p50_ms": _ms(self.latency.percentile(50)),
+            "p95_ms": _ms(self.latency.percentile(95)),
+            "first_token_p50_ms": _ms(self.first_token.percentile(50)),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class StubBackend:
+    """
+    Offline stand-in for Groq used for load testing.
+    Sleeps for `llm_stub_latency` seconds and echoes the question back.
+    """
+
+    async def complete(self, messages: list, timeout: float = None, **params) -> str:
+        await asyncio.sleep(settings.llm_stub_latency)
+        question = messages[-1]["content"] if messages else ""
+        answer = f"[stub] You asked: {question}"
+        record_llm_usage(
+            params.get("model", "stub"),
+            sum(estimate_tokens(m.get("content", "")) for m in messages),
+            estimate_tokens(answer),
+        )
+        return answer
+
+    async def stream(self, messages: list, timeout: float = None, **params):
+        question = messages[-1]["content"] if messages else ""
+        answer = f"[stub] You asked: {question}"
+        tokens = answer.split(" ")
+        for i, token in enumerate(tokens):
+            await asyncio.sleep(settings.llm_stub_latency / len(tokens))
+            yield token if i == 0 else " " + token
+        record_llm_usage(
+            params.get("model", "stub"),
+            sum(estimate_tokens(m.get("content", "")) for m in messages),
+            estimate_tokens(answer),
+        )
+
+    async def aclose(self):
+        pass
+
+
+class GroqBackend:
+    """
+    Groq backend running on the async client with a shared, bounded connection pool.
+    """
+
+    def __init__(self):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(settings.llm_timeout, connect=settings.llm_connect_timeout),
+        )
+        self.client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            base_url=settings.groq_base_url or None,
+            http_client=self.http_client,
+            max_retries=settings.llm_max_retries,
+        )
+
+    async def complete(self, messages: list, timeout: float = None, **params) -> str:
+        chat_completion = await self.client.chat.completions.create(
+            messages=messages,
+            stream=False,
+            timeout=timeout or settings.llm_timeout,
+            **params
+        )
+        if chat_completion.usage is not None:
+            record_llm_usage(
+                params.get("model", ""),
+                chat_completion.usage.prompt_tokens,
+                chat_completion.usage.completion_tokens,
+            )
+        return chat_completion.choices[0].message.content
+
+    async def stream(self, messages: list, timeout: float = None, **params):
+        chunks = await self.client.chat.completions.create(
+            messages=messages,
+            stream=True,
+            timeout=timeout or settings.llm_timeout,
+            **params
+        )
+        async for chunk in chunks:
+            # Groq reports usage on the final chunk
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage is not None:
+                record_llm_usage(params.get("model", ""), usage.prompt_tokens, usage.completion_tokens)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+
+class LLMClient:
+    """
+    Async LLM client shared by all requests.
+    Caps the number of in-flight upstream calls with a semaphore so a burst of
+    LLM-bound requests cannot exhaust the connection pool.
+
+    Models are tried in LLM_MODELS order, each under its own timeout, skipping
+    models whose circuit breaker is open. When a call outlives the model's
+    hedge percentile, the next model is asked in parallel and the first
+    successful answer wins. A hedge needs a concurrency slot of its own and is
+    skipped when none is free, so LLM_MAX_CONCURRENCY is never exceeded.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._semaphore = None
+        self._models = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = StubBackend() if settings.llm_backend == "stub" else GroqBackend()
+        return self._backend
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        return self._semaphore
+
+    @property
+    def models(self) -> List[ModelState]:
+        if self._models is None:
+            self._models = [
+                ModelState(spec)
+                for spec in parse_models(settings.llm_models, settings.groq_model, settings.llm_timeout)
+            ]
+        return self._models
+
+    @staticmethod
+    def _next_model(queue: deque) -> Optional[ModelState]:
+        """
+        Pop models until one whose breaker would let a call through. The half-open
+        trial is only taken by the call itself (breaker.allow()), so a call that is
+        cancelled before it starts cannot hold it.
+        """
+        while queue:
+            model = queue.popleft()
+            if model.breaker.ready():
+                return model
+        return None
+
+    @staticmethod
+    def _params(model: ModelState) -> dict:
+        return {
+            "model": model.spec.name,
+            "timeout": model.spec.timeout,
+            "temperature": 0.7,
+            "max_tokens": 1024,
+            "top_p": 1,
+        }
+
+    async def _attempt(self, model: ModelState, messages: list) -> str:
+        # A hedge may have waited for its slot while another call took the half-open trial
+        if not model.breaker.allow():
+            raise LLMUnavailableError(f"LLM model {model.spec.name} is temporarily unavailable.")
+        started = time.perf_counter()
+        outcome = "error"
+        model.calls += 1
+        try:
+            answer = await asyncio.wait_for(
+                self.backend.complete(messages, **self._params(model)),
+                timeout=model.spec.timeout,
+            )
+            outcome = "ok"
+            model.breaker.record_success()
+            model.latency.observe(time.perf_counter() - started)
+            return answer
+        except asyncio.CancelledError:
+            # Lost a hedge race (or the caller went away); not the model's fault
+            outcome = "cancelled"
+            model.breaker.release()
+            raise
+        except Exception as e:
+            outcome = "timeout" if isinstance(e, _TIMEOUT_ERRORS) else "error"
+            model.failures += 1
+            model.breaker.record_failure()
+            raise
+        finally:
+            observe_llm_call(model.spec.name, outcome, time.perf_counter() - started)
+
+    async def _hedge(self, model: ModelState, messages: list) -> str:
+        async with self.semaphore:
+            return await self._attempt(model, messages)
+
+    async def complete(self, messages: list) -> str:
+        async with self.semaphore:
+            queue = deque(self.models)
+            pending = {}
+            hedged = False
+            last_error = LLMUnavailableError("All LLM models are temporarily unavailable.")
+            try:
+                while True:
+                    if not pending:
+                        model = self._next_model(queue)
+                        if model is None:
+                            raise last_error
+                        pending[asyncio.ensure_future(self._attempt(model, messages))] = model
+                    hedge_delay = None
+                    if queue and not hedged and len(pending) == 1:
+                        hedge_delay = next(iter(pending.values())).hedge_delay()
+                    done, _ = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        # The call is slower than usual; ask the next model too if a slot is free
+                        hedged = True
+                        slow_model = next(iter(pending.values()))
+                        if self.semaphore.locked():
+                            slow_model.hedges_skipped += 1
+                            continue
+                        model = self._next_model(queue)
+                        if model is not None:
+                            slow_model.hedges += 1
+                            pending[asyncio.ensure_future(self._hedge(model, messages))] = model
+                        continue
+                    for task in done:
+                        pending.pop(task)
+                        if task.exception() is None:
+                            return task.result()
+                        last_error = task.exception()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    async def stream(self, messages: list):
+        """
+        Yield answer tokens as they arrive from the backend.
+        A model that fails or times out before its first token is replaced by
+        the next one; once tokens have been sent the stream cannot switch.
+        """
+        async with self.semaphore:
+            last_error = LLMUnavailableError("All LLM models are temporarily unavailable.")
+            queue = deque(self.models)
+            while True:
+                model = self._next_model(queue)
+                if model is None:
+                    raise last_error
+                if not model.breaker.allow():
+                    continue
+                started = time.perf_counter()
+                outcome = "error"
+                model.calls += 1
+                first = True
+                tokens = self.backend.stream(messages, **self._params(model))
+                try:
+                    try:
+                        token = await asyncio.wait_for(tokens.__anext__(), timeout=model.spec.timeout)
+                    except StopAsyncIteration:
+                        token = None
+                    if token is not None:
+                        # Later tokens arrive as fast as the client reads them, so only this is a model latency
+                        model.first_token.observe(time.perf_counter() - started)
+                        yield token
+                        first = False
+                        async for token in tokens:
+                            yield token
+                    outcome = "ok"
+                    model.breaker.record_success()
+                    return
+                except (asyncio.CancelledError, GeneratorExit):
+                    outcome = "cancelled"
+                    model.breaker.release()
+                    raise
+                except Exception as e:
+                    outcome = "timeout" if isinstance(e, _TIMEOUT_ERRORS) else "error"
+                    model.failures += 1
+                    model.breaker.record_failure()
+                    if not first:
+                        raise
+                    last_error = e
+                finally:
+                    await tokens.aclose()
+                    observe_llm_call(model.spec.name, outcome, time.perf_counter() - started)
+
+    def stats(self) -> list:
+        return [model.stats() for model in self.models]
+
+    async def aclose(self):
+        if self._backend is not None:
+            await self._backend.aclose()
+            self._backend = None
+        self._semaphore = None
+
+
+llm_client = LLMClient()
@@ -1,15 +1,91 @@
-from fastapi import FastAPI, HTTPException, Request, status
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from groq import Groq
-from app.models import ChatRequest, ChatResponse
+from starlette.background import BackgroundTask
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+from pydantic import ValidationError
+from app.models import (
+    BatchChatItem,
+    BatchChatRequest,
+    BatchChatResponse,
+    BatchChatResult,
+    ChatRequest,
+    ChatResponse,
+    ChatTurn,
+)
+from app.admission import AdmissionRejected, admission, admit, client_id, socket_limiter
 from app.config import settings
-from app.contexts.context_data import get_context
+from app.contexts.registry import registry
+from app.cache import answer_cache, make_cache_key
+from app.canned import common_answer, has_canned_answers, match_greeting, welcome_response
+from app.intent import load_classifier
+from app.llm import llm_client
+from app.metrics import StageTimer, llm_usage, observe_request, track_llm_usage
+from app.metrics import registry as metrics_registry
+from app.moderation import MODERATION_MESSAGES, moderator
+from app.querylog import make_record, query_log
+from app.retrieval import faq_answer as faq_answer_text
+from app.sessions import session_store
+from app.singleflight import SingleFlight
+from app.text import resolve_language
+
+logger = logging.getLogger(__name__)
+
+llm_singleflight = SingleFlight()
+intent_classifier = load_classifier(settings.intent_model_file)
+
+async def _watch_contexts(interval: float):
+    """Hot-reload the context registry when a context file changes"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            registry.reload_if_changed()
+        except Exception:
+            pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # List the context data files; each context is loaded on first use
+    registry.load()
+    watcher = None
+    if settings.context_reload_interval > 0:
+        watcher = asyncio.create_task(_watch_contexts(settings.context_reload_interval))
+    log_writer = asyncio.create_task(query_log.run()) if query_log is not None else None
+    # The shared answer store opens (and creates its schema) and writes on a thread
+    store_writer = None
+    if answer_cache is not None and answer_cache.shared is not None:
+        store_writer = asyncio.create_task(answer_cache.shared.run())
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if log_writer is not None:
+        # The writer flushes what is still queued when it is cancelled
+        log_writer.cancel()
+        try:
+            await log_writer
+        except asyncio.CancelledError:
+            pass
+    if store_writer is not None:
+        # Like the query log, the store writes what is still queued when it is cancelled
+        store_writer.cancel()
+        try:
+            await store_writer
+        except asyncio.CancelledError:
+            pass
+    # Release pooled upstream connections on shutdown
+    await llm_client.aclose()
 
 app = FastAPI(
     title="Government Chatbot API",
     description="Context-aware chatbot for government services",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,9 +97,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Groq client
-groq_client = Groq(api_key=settings.groq_api_key)
-
 @app.get("/")
 async def root():
     return {
@@ -42,267 +115,811 @@ async def root():
 
 @app.get("/contexts")
 async def list_contexts():
-    """List all available contexts dynamically from context files"""
-    import os
-    context_dir = os.path.dirname(__file__) + "/contexts"
-    context_files = [
-        f[:-3] for f in os.listdir(context_dir)
-        if f.endswith('.py') and f not in ('__init__.py', 'context_data.py', 'default.py')
-    ]
+    """List all available contexts from the context registry"""
+    context_files = list(registry.context_names)
     return {
         "contexts": context_files,
         "total": len(context_files)
     }
-    try:
-        context_dir = os.path.dirname(__file__) + "/contexts"
-        if not os.path.exists(context_dir):
-            raise HTTPException(status_code=500, detail="Context directory not found.")
-        context_files = [
-            f[:-3] for f in os.listdir(context_dir)
-            if f.endswith('.py') and f not in ('__init__.py', 'context_data.py', 'default.py')
-        ]
-        return {
-            "contexts": context_files,
-            "total": len(context_files)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: Request):
+def _classify(question: str, language: str):
+    """(intent, confidence) from the intent classifier, or whole-word phrase matching without a model"""
+    if intent_classifier is not None:
+        return intent_classifier.predict(question)
+    if match_greeting(question, language):
+        return "greeting", 1.0
+    if common_answer(question, language):
+        return "canned", 1.0
+    return "faq", 0.0
+
+
+def _local_answer(context_name: str, question: str, language: str, faq_handler=None, timer: StageTimer = None,
+                  faq_search=None):
     """
-    Main chat endpoint
-    Accepts a JSON body with 'context', 'question', optional 'conversation_history', and optional 'language'.
+    Run the moderation, intent, greeting, common-question and FAQ tiers.
+    Returns (tier, response) when one of them answers the question, otherwise None.
     """
-    try:
-        body = await request.json()
-        context_name = body.get("context")
-        question = body.get("question")
-        conversation_history = body.get("conversation_history", [])
-        language = body.get("language", "en")
-
-        from app.contexts.context_data import get_context
-        context_data = get_context(context_name, language=language)
-
-        # Check for inappropriate language FIRST before any other processing
-        BAD_WORDS = [
-            "fuck", "shit", "bitch", "asshole", "bastard", "damn", "piss", "dick", "cunt", "fag", "slut", "whore",
-            "පිස්සෝ", "කෙල්ල", "පොන්නයා", "පකයා", "පකී", "පොන්නි", "பொன்னையா", "பক्कியා", "பொன்னி", "பக্কি"
-        ]
-        
-        if any(bad_word in question.lower() for bad_word in BAD_WORDS):
-            # Create appropriate error messages based on language
-            error_messages = {
-                "en": {
-                    "answer": "I cannot process requests containing inappropriate language. Please rephrase your question respectfully.",
-                    "error": "Inappropriate language detected. Please use respectful language when asking questions."
-                },
-                "si": {
-                    "answer": "අනුචිත භාෂාව සහිත ඉල්ලීම් මට සැකසිය නොහැක. කරුණාකර ඔබගේ ප්‍රශ්නය ගෞරවනීය ලෙස නැවත ප්‍රකාශ කරන්න.",
-                    "error": "අනුචිත භාෂාව අනාවරණය විය. ප්‍රශ්න ඇසීමේදී කරුණාකර ගෞරවනීය භාෂාව භාවිතා කරන්න."
-                },
-                "ta": {
-                    "answer": "பொருத்தமற்ற மொழிக் கொண்ட கோரிக்கைகளை என்னால் செயலாக்க முடியாது. தயவுசெய்து உங்கள் கேள்வியை மரியாதையுடன் மறுபரிசீலனை செய்யுங்கள்.",
-                    "error": "பொருத்தமற்ற மொழி கண்டறியப்பட்டது. கேள்விகள் கேட்கும்போது தயவுசெய்து மரியாதையான மொழியைப் பயன்படுத்துங்கள்."
-                }
-            }
-            lang_messages = error_messages.get(language, error_messages["en"])
-            return ChatResponse(
-                answer=lang_messages["answer"],
-                context_used=context_name,
-                success=False,
-                error=lang_messages["error"]
-            )
+    timer = timer or StageTimer()
+    # Check for inappropriate language FIRST before any other processing
+    timer.begin("moderation")
+    matched_terms = moderator.scan(question)
+    if matched_terms:
+        logger.info("Moderation blocked question in context %s: %s", context_name, matched_terms)
+        lang_messages = MODERATION_MESSAGES.get(language, MODERATION_MESSAGES["en"])
+        return "moderation", ChatResponse(
+            answer=lang_messages["answer"],
+            context_used=context_name,
+            success=False,
+            error=lang_messages["error"]
+        )
 
-        # Check for greetings and provide welcome responses
-        greetings = {
-            "en": ["hi", "hello", "hey", "good morning", "good afternoon", "good evening", "greetings", "welcome"],
-            "si": ["හායි", "හලෝ", "ආයුබෝවන්", "සුබ උදෑසනක්", "සුබ දවසක්", "සුබ සන්ධ්‍යාවක්", "නමස්කාර"],
-            "ta": ["வணக்கம்", "ஹலோ", "ஹாய்", "காலை வணக்கம்", "மாலை வணக்கம்", "நமஸ்காரம்"]
-        }
-        
-        welcome_responses = {
-            "en": f"Hello! Welcome to the {context_name.replace('_', ' ').title()} information service. How can I assist you today?",
-            "si": f"ආයුබෝවන්! {context_name.replace('_', ' ').title()} තොරතුරු සේවයට සාදරයෙන් පිළිගනිමු. අද මම ඔබට කෙසේ උපකාර කළ හැකිද?",
-            "ta": f"வணக்கம்! {context_name.replace('_', ' ').title()} தகவல் சேवைக்கு வரவேற்கிறோம். இன்று நான் உங்களுக்கு எப்படி உதவ முடியும்?"
-        }
-        
-        question_lower = question.lower().strip()
-        if any(greeting in question_lower for greeting in greetings.get(language, greetings["en"])):
-            return ChatResponse(
-                answer=welcome_responses.get(language, welcome_responses["en"]),
+    # Route the question locally before deciding which tier answers it
+    timer.begin("intent")
+    intent, confidence = _classify(question, language)
+    confident = confidence >= settings.intent_min_confidence
+
+    # Check for greetings and provide welcome responses
+    timer.begin("greeting")
+    if intent == "greeting" and confident:
+        return "greeting", ChatResponse(
+            answer=welcome_response(context_name, language),
+            context_used=context_name,
+            success=True
+        )
+
+    # Handle common general questions about the service; a canned intent without a
+    # matching canned answer falls through to the FAQ tiers and the LLM
+    timer.begin("common_question")
+    if intent == "canned" and confident and has_canned_answers(context_name):
+        canned_answer = common_answer(question, language)
+        if canned_answer:
+            return "common_question", ChatResponse(
+                answer=canned_answer,
                 context_used=context_name,
                 success=True
             )
 
-        # Handle common general questions about the service
-        common_questions = {
-            "en": {
-                "what is": "The President's Fund of Sri Lanka is a government initiative that provides financial assistance for medical treatments, particularly for kidney patients, cancer patients, children with special needs, persons with disabilities, and disaster relief beneficiaries.",
-                "about": "The President's Fund helps Sri Lankan citizens access medical care by providing financial support for surgeries and treatments. Applications can be submitted through local Divisional Secretariats.",
-                "help": "The President's Fund provides medical assistance for various conditions. You can apply through the website (www.presidentsfund.gov.lk), WhatsApp (0740854527), or your nearest Divisional Secretariat.",
-                "services": "The President's Fund offers financial assistance for medical treatments including support for kidney patients, cancer patients, children with special needs, persons with disabilities, and disaster relief situations."
-            },
-            "si": {
-                "what is": "ශ්‍රී ලංකා ජනාධිපති අරමුදල රජයේ මුලපිරීමක් වන අතර එය වෛද්‍ය ප්‍රතිකාර සඳහා, විශේෂයෙන් වකුගඩු රෝගීන්, පිළිකා රෝගීන්, විශේෂ අවශ්‍යතා ඇති දරුවන්, ආබාධිත පුද්ගලයන් සහ ආපදා සහන ලබන්නන් සඳහා මූල්‍ය ආධාර ලබා දෙයි.",
-                "about": "ජනාධිපති අරමුදල ශ්‍රී ලාංකික පුරවැසියන්ට ශල්‍යකර්ම සහ ප්‍රතිකාර සඳහා මූල්‍ය ආධාර ලබා දීමෙන් වෛද්‍ය සේවාවන්ට ප්‍රවේශය ලබා දෙයි. ප්‍රාදේශීය ලේකම් කාර්යාල හරහා අයදුම්පත් ඉදිරිපත් කළ හැකිය.",
-                "help": "ජනාධිපති අරමුදල විවිධ රෝග තත්ත්වයන් සඳහා වෛද්‍ය ආධාර ලබා දෙයි. ඔබට වෙබ් අඩවිය (www.presidentsfund.gov.lk), WhatsApp (0740854527), හෝ ආසන්නතම ප්‍රාදේශීය ලේකම් කාර්යාලය හරහා අයදුම් කළ හැකිය.",
-                "services": "ජනාධිපති අරමුදල වකුගඩු රෝගීන්, පිළිකා රෝගීන්, විශේෂ අවශ්‍යතා ඇති දරුවන්, ආබාධිත පුද්ගලයන් සහ ආපදා තත්ත්වයන් සඳහා මූල්‍ය ආධාර ඇතුළුව වෛද්‍ය ප්‍රතිකාර සඳහා මූල්‍ය ආධාර ලබා දෙයි."
-            },
-            "ta": {
-                "what is": "இலங்கை ஜனாதிபதி நிதியம் அரசாங்கத்தின் முன்முயற்சியாகும், இது மருத்துவ சிகிச்சைகளுக்கு, குறிப்பாக சிறுநீரக நோயாளிகள், புற்றுநோய் நோயாளிகள், சிறப்பு தேவைகள் உள்ள குழந்தைகள், மாற்றுத்திறனாளிகள் மற்றும் பேரிடர் நிவாரண பயனாளிகளுக்கு நிதி உதவி வழங்குகிறது.",
-                "about": "ஜனாதிபதி நிதியம் இலங்கை குடிமக்களுக்கு அறுவை சிகிச்சைகள் மற்றும் சிகிச்சைகளுக்கு நிதி உதவி வழங்குவதன் மூலம் மருத்துவ பராமரிப்பை அணுக உதவுகிறது. உள்ளூர் பிரதேச செயலாளர் அலுவலகங்கள் மூலம் விண்ணப்பங்களை சமர்ப்பிக்க முடியும்.",
-                "help": "ஜனாதிபதி நிதியம் பல்வேறு நிலைமைகளுக்கு மருத்துவ உதவி வழங்குகிறது. நீங்கள் இணையதளம் (www.presidentsfund.gov.lk), WhatsApp (0740854527), அல்லது அருகிலுள்ள பிரதேச செயலாளர் அலுவலகம் மூலம் விண்ணப்பிக்க முடியும்.",
-                "services": "ஜனாதிபதி நிதியம் சிறுநீரக நோயாளிகள், புற்றுநோய் நோயாளிகள், சிறப்பு தேவைகள் உள்ள குழந்தைகள், மாற்றுத்திறனாளிகள் மற்றும் பேரிடர் சூழ்நிலைகளுக்கான ஆதரவு உட்பட மருத்துவ சிகிச்சைகளுக்கு நிதி உதவி வழங்குகிறது."
-            }
-        }
-        
-        # Check for common questions
-        lang_questions = common_questions.get(language, common_questions["en"])
-        for keyword, answer in lang_questions.items():
-            if keyword in question_lower:
-                return ChatResponse(
-                    answer=answer,
+    # Try FAQ answer if available
+    faq_answer = None
+    timer.begin("faq")
+    try:
+        if faq_handler is not None:
+            faq_match = faq_handler(question)
+            faq_answer = faq_match.answer if faq_match is not None else None
+            # Return the FAQ answer unless it's the default "sorry" message
+            if faq_answer and not faq_answer.startswith("Sorry") and not faq_answer.startswith("කණගාටුයි") and not faq_answer.startswith("மன்னிக்கவும்"):
+                return "faq", ChatResponse(
+                    answer=faq_answer,
+                    context_used=context_name,
+                    success=True,
+                    related_questions=list(faq_match.related_faqs) or None
+                )
+        # When the FAQ handler and keyword rules miss, a confident FAQ intent accepts a
+        # weaker retrieval match than the FAQ handler does
+        if faq_search is not None and intent == "faq" and confidence >= settings.intent_faq_confidence:
+            matches = faq_search(question, 1)
+            if matches and matches[0][1] >= settings.intent_faq_min_score:
+                return "faq", ChatResponse(
+                    answer=faq_answer_text(matches[0][0]),
                     context_used=context_name,
                     success=True
                 )
-
-        # Check for inappropriate language
-        BAD_WORDS = [
-            "fuck", "shit", "bitch", "asshole", "bastard", "damn", "piss", "dick", "cunt", "fag", "slut", "whore",
-            "පිස්සෝ", "කෙල්ල", "පොන්නයා", "පකයා", "පකී", "පොන්නි", "බොකයා", "බක්කියා", "බොන්නි", "බක්කි"
-        ]
-        
-        if any(bad_word in question.lower() for bad_word in BAD_WORDS):
-            # Create appropriate error messages based on language
-            error_messages = {
-                "en": {
-                    "answer": "I cannot process requests containing inappropriate language. Please rephrase your question respectfully.",
-                    "error": "Inappropriate language detected. Please use respectful language when asking questions."
-                },
-                "si": {
-                    "answer": "අනුචිත භාෂාව සහිත ඉල්ලීම් මට සැකසිය නොහැක. කරුණාකර ඔබගේ ප්‍රශ්නය ගෞරවනීය ලෙස නැවත ප්‍රකාශ කරන්න.",
-                    "error": "අනුචිත භාෂාව අනාවරණය විය. ප්‍රශ්න ඇසීමේදී කරුණාකර ගෞරවනීය භාෂාව භාවිතා කරන්න."
-                },
-                "ta": {
-                    "answer": "பொருத்தமற்ற மொழியைக் கொண்ட கோரிக்கைகளை என்னால் செயலாக்க முடியாது. தயவுசெய்து உங்கள் கேள்வியை மரியாதையுடன் மறுபரிசீலனை செய்யுங்கள்.",
-                    "error": "பொருத்தமற்ற மொழி கண்டறியப்பட்டது. கேள்விகள் கேட்கும்போது தயவுசெய்து மரியாதையான மொழியைப் பயன்படுத்துங்கள்."
-                }
-            }
-            
-            lang_messages = error_messages.get(language, error_messages["en"])
-            
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "answer": lang_messages["answer"],
-                    "context_used": context_name,
-                    "success": False,
-                    "error": lang_messages["error"]
-                }
+        # If it's a "sorry" message, still return it but with success=False
+        if faq_answer and (faq_answer.startswith("Sorry") or faq_answer.startswith("කණගාටුයි") or faq_answer.startswith("மன்னிக்கவும்")):
+            return "faq", ChatResponse(
+                answer=faq_answer,
+                context_used=context_name,
+                success=False,
+                error="No specific information found for this question."
             )
+    except Exception:
+        pass
 
-        # Try FAQ answer if available, but enforce question language matches selected language
-        faq_answer = None
-        import re
-        def is_sinhala(text):
-            return bool(re.search(r"[\u0D80-\u0DFF]", text))
-        def is_tamil(text):
-            return bool(re.search(r"[\u0B80-\u0BFF]", text))
-        def is_english(text):
-            return bool(re.search(r"[A-Za-z]", text))
-
-        # Language check logic
-        if language == "en" and not is_english(question):
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "answer": "Please ask your question in English.",
-                    "context_used": context_name,
-                    "success": False,
-                    "error": "Question language does not match selected language."
-                }
-            )
-        if language == "si" and not is_sinhala(question):
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "answer": "කරුණාකර ඔබේ ප්‍රශ්නය සිංහලෙන් ඉදිරිපත් කරන්න.",
-                    "context_used": context_name,
-                    "success": False,
-                    "error": "Question language does not match selected language."
-                }
-            )
-        if language == "ta" and not is_tamil(question):
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "answer": "தயவுசெய்து உங்கள் கேள்வியை தமிழில் கேளுங்கள்.",
-                    "context_used": context_name,
-                    "success": False,
-                    "error": "Question language does not match selected language."
-                }
+    return None
+
+
+def _build_messages(context_entry, conversation_history: list, question: str) -> list:
+    """Build the messages for Groq, with only the context chunks relevant to the question"""
+    token_budget = settings.prompt_context_token_budget or context_entry.prompt.total_tokens
+    messages = [
+        {
+            "role": "system",
+            "content": context_entry.prompt.build_system_message(
+                question,
+                top_k=settings.prompt_top_k_chunks,
+                token_budget=token_budget,
+                label=f"{context_entry.name}/{context_entry.language}"
             )
+        }
+    ]
+    if conversation_history:
+        messages.extend(conversation_history)
+    messages.append({
+        "role": "user",
+        "content": question
+    })
+    return messages
+
+
+async def _llm_answer(context_entry, context_name: str, language: str, question: str, conversation_history: list,
+                      timer: StageTimer = None, client: str = None):
+    """
+    Answer from the LLM tier, going through the answer cache. Returns (tier, answer).
+    Only the call that goes upstream needs admission; AdmissionRejected is raised when
+    it is turned away. Cache hits and requests that coalesce onto an identical call in
+    flight are never charged.
+    """
+    timer = timer or StageTimer()
+    track_llm_usage()
+    timer.begin("cache")
+    cache_key = make_cache_key(context_name, language, question, conversation_history)
+    answer = answer_cache.get(cache_key) if answer_cache is not None else None
+    if answer is not None:
+        return "cache", answer
+
+    async def complete():
+        # Only the caller that goes upstream is admitted; coalesced callers wait on its task
+        with admit(client):
+            messages = _build_messages(context_entry, conversation_history, question)
+            answer = await llm_client.complete(messages)
+        if answer_cache is not None:
+            answer_cache.set(cache_key, answer)
+        return answer
+
+    timer.begin("llm")
+    if not settings.llm_coalesce_requests:
+        return "llm", await complete()
+    # Identical questions already in flight share one upstream call
+    return "llm", await llm_singleflight.do(cache_key, complete)
+
+
+def _local_candidate(context_entry, question: str):
+    """
+    Best local answer for a question the local tiers left to the LLM: the top FAQ match
+    when it scores at least ANSWER_DEADLINE_FAQ_MIN_SCORE (below the FAQ tier's own
+    cutoff), else the best keyword rule, else the context's fallback_answer
+    """
+    if context_entry.faq_search is not None:
+        matches = context_entry.faq_search(question, 1)
+        if matches and matches[0][1] >= settings.answer_deadline_faq_min_score:
+            return faq_answer_text(matches[0][0])
+    if context_entry.keyword_search is not None:
+        match = context_entry.keyword_search(question)
+        if match is not None:
+            return match.answer
+    return context_entry.fallback_answer
+
+
+def _drain(task: asyncio.Task):
+    """Done callback for an abandoned LLM call: log its failure instead of leaving it unretrieved"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.info("LLM call finished after its deadline with %r", task.exception())
+
+
+async def _answer_by_deadline(llm_call, deadline: float, candidate):
+    """
+    Await llm_call (an _llm_answer() coroutine) until deadline, a time.perf_counter() value.
+    The local candidate is computed while the call is in flight; when the deadline passes
+    or the call fails, it is returned as ("degraded", answer) and a late call is left to
+    finish in the background so its answer still reaches the answer cache. Without a
+    candidate the call is awaited as usual; admission rejections are always raised.
+    """
+    task = asyncio.ensure_future(llm_call)
+    # Let the call reach the cache, admission and upstream before doing local work
+    await asyncio.sleep(0)
+    fallback = None
+    if not task.done() or task.exception() is not None:
+        fallback = candidate()
+    if fallback is None:
+        return await task
+    await asyncio.wait({task}, timeout=max(0.0, deadline - time.perf_counter()))
+    if not task.done():
+        task.add_done_callback(_drain)
+        return "degraded", fallback
+    try:
+        return task.result()
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.warning("LLM call failed, answering with the local candidate: %s", e)
+        return "degraded", fallback
+
+
+def _open_session(session_id, conversation_history: list):
+    """
+    Return the server-side session with this id (a new one for an empty id), or None when
+    the client sends no session_id and keeps its own history
+    """
+    if session_id is None:
+        return None
+    session_id = session_id or None
+    if session_id is not None and len(session_id) > 128:
+        raise ValueError("session_id must be at most 128 characters.")
+    return session_store.get_or_create(session_id, conversation_history)
+
+
+def _record_turn(session, question: str, response):
+    """
+    Append an answered turn to the session and tag the response with its id. Degraded
+    answers are not turns: later prompts would carry the fallback text as the assistant's
+    """
+    if session is None or not isinstance(response, ChatResponse):
+        return response
+    if response.success and response.answer and not response.degraded:
+        session.add_turn(question, response.answer)
+    response.session_id = session.id
+    return response
+
+
+def _observe(endpoint: str, context_entry, language: str, tier: str, timer: StageTimer, *responses,
+             question: str = None, answer: str = None):
+    """
+    Record request metrics, add the question to the query log and attach the stage
+    breakdown as a Server-Timing header
+    """
+    timer.end()
+    context_label = context_entry.name if context_entry is not None else "unknown"
+    observe_request(endpoint, context_label, language, tier, timer)
+    if query_log is not None and question is not None:
+        prompt_tokens, completion_tokens = llm_usage()
+        query_log.record(make_record(
+            endpoint, context_label, language, question, tier, round(timer.total() * 1000, 2),
+            prompt_tokens, completion_tokens, answer if tier == "llm" else None
+        ))
+    for response in responses:
+        if response is not None and hasattr(response, "headers"):
+            response.headers["Server-Timing"] = timer.server_timing()
+            response.headers["X-Answer-Tier"] = tier
+
 
+def _once(fn):
+    """Wrap fn so that only the first call runs it"""
+    called = False
+
+    def wrapper():
+        nonlocal called
+        if not called:
+            called = True
+            fn()
+    return wrapper
+
+
+def _json_response(chat_response: ChatResponse, status_code: int = 200, headers: dict = None) -> ORJSONResponse:
+    """Serialize a ChatResponse with orjson, skipping FastAPI's response_model encoding"""
+    return ORJSONResponse(content=chat_response.model_dump(), status_code=status_code, headers=headers)
+
+
+def _rejected(e: AdmissionRejected, context_name: str, language: str, session=None) -> ORJSONResponse:
+    """429/503 answer for a request turned away by LLM admission control"""
+    return _json_response(ChatResponse(
+        answer="",
+        context_used=context_name or "",
+        success=False,
+        error=e.reason,
+        session_id=session.id if session is not None else None,
+        detected_language=language
+    ), status_code=e.status_code, headers={"Retry-After": str(e.retry_after)})
+
+
+async def _read_chat_request(request: Request) -> ChatRequest:
+    """
+    Decode and validate a /chat or /chat/stream body. Raises HTTPException:
+    413 for a body over CHAT_MAX_BODY_BYTES (refused from Content-Length before reading
+    when the client sends it) and 422 when the body is not a valid ChatRequest.
+    """
+    limit = settings.chat_max_body_bytes
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"The request body can be at most {limit} bytes."
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    try:
+        # orjson + model_validate beats model_validate_json on non-ASCII (Sinhala/Tamil) text
+        return ChatRequest.model_validate(orjson.loads(body))
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid JSON: {e}")
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}" if error["loc"] else error["msg"]
+            for error in e.errors()[:3]
+        )
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+
+def _invalid_request(e: HTTPException) -> ORJSONResponse:
+    return _json_response(
+        ChatResponse(answer="", context_used="", success=False, error=e.detail),
+        status_code=e.status_code
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _ws_event(event: str, data: dict) -> str:
+    return json.dumps({"type": event, **data}, ensure_ascii=False)
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: Request):
+    """
+    Main chat endpoint
+    Accepts a JSON body with 'context', 'question', optional 'conversation_history', optional 'language'
+    and optional 'session_id' (server-side history; send an empty string to start a new session).
+    """
+    timer = StageTimer()
+    context_name = None
+    question = None
+    context_entry = None
+    session = None
+    language = "en"
+    try:
+        timer.begin("parse")
         try:
-            import importlib
-            context_mod_name = f"app.contexts.{context_name}{'_' + language if language != 'en' else ''}"
-            context_mod = importlib.import_module(context_mod_name)
-            if hasattr(context_mod, 'get_faq_answer'):
-                faq_answer = context_mod.get_faq_answer(question)
-                # Return the FAQ answer unless it's the default "sorry" message
-                if faq_answer and not faq_answer.startswith("Sorry") and not faq_answer.startswith("කණගාටුයි") and not faq_answer.startswith("மன்னிக்கவும்"):
-                    return ChatResponse(
-                        answer=faq_answer,
-                        context_used=context_name,
-                        success=True
-                    )
-                # If it's a "sorry" message, still return it but with success=False
-                elif faq_answer and (faq_answer.startswith("Sorry") or faq_answer.startswith("කණගාටුයි") or faq_answer.startswith("மன்னிக்கவும்")):
-                    return ChatResponse(
-                        answer=faq_answer,
-                        context_used=context_name,
-                        success=False,
-                        error="No specific information found for this question."
-                    )
-        except Exception:
-            pass
+            chat_request = await _read_chat_request(request)
+        except HTTPException as e:
+            invalid = _invalid_request(e)
+            _observe("chat", None, language, "error", timer, invalid)
+            return invalid
+        context_name = chat_request.context
+        question = chat_request.question
+        conversation_history = chat_request.conversation_history or []
+
+        # Answer in the language the question is written in, whatever was declared
+        timer.begin("language")
+        language = resolve_language(question, chat_request.language)
 
-        # Build the messages for Groq
-        messages = [
-            {
-                "role": "system",
-                "content": f"{context_data['system_prompt']}\n\nContext Information:\n{context_data['context_info']}"
-            }
-        ]
-        if conversation_history:
-            messages.extend(conversation_history)
-        messages.append({
-            "role": "user",
-            "content": question
-        })
-        chat_completion = groq_client.chat.completions.create(
-            messages=messages,
-            model=settings.groq_model,
-            temperature=0.7,
-            max_tokens=1024,
-            top_p=1,
-            stream=False
+        timer.begin("session")
+        session = _open_session(chat_request.session_id, conversation_history)
+        if session is not None:
+            conversation_history = session.history()
+
+        timer.begin("context")
+        context_entry = registry.get(context_name, language)
+
+        local_answer = _local_answer(context_name, question, language, context_entry.faq_handler, timer,
+                                     faq_search=context_entry.faq_search)
+        if local_answer is not None:
+            tier, local_response = local_answer
+            local_response.detected_language = language
+            response = _json_response(_record_turn(session, question, local_response))
+            _observe("chat", context_entry, language, tier, timer, response, question=question)
+            return response
+
+        llm_call = _llm_answer(
+            context_entry, context_name, language, question, conversation_history, timer, client_id(request)
         )
-        answer = chat_completion.choices[0].message.content
-        return ChatResponse(
+        budget = chat_request.deadline or settings.answer_deadline
+        if budget > 0:
+            tier, answer = await _answer_by_deadline(
+                llm_call, timer.started + budget, lambda: _local_candidate(context_entry, question)
+            )
+        else:
+            tier, answer = await llm_call
+        response = _json_response(_record_turn(session, question, ChatResponse(
             answer=answer,
             context_used=context_name,
-            success=True
-        )
+            success=True,
+            detected_language=language,
+            degraded=tier == "degraded"
+        )))
+        _observe("chat", context_entry, language, tier, timer, response, question=question, answer=answer)
+        return response
+    except AdmissionRejected as e:
+        rejected = _rejected(e, context_name, language, session)
+        _observe("chat", context_entry, language, "rejected", timer, rejected, question=question)
+        return rejected
     except Exception as e:
-        return ChatResponse(
+        response = _json_response(ChatResponse(
             answer="",
-            context_used=body.get("context", ""),
+            context_used=context_name or "",
             success=False,
             error=str(e)
+        ))
+        _observe("chat", context_entry, language, "error", timer, response, question=question)
+        return response
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: Request):
+    """
+    Streaming chat endpoint
+    Accepts the same body as /chat and answers with Server-Sent Events.
+    Moderation, greeting and FAQ answers arrive as a single 'answer' event;
+    LLM answers arrive as 'token' events followed by a 'done' event that
+    reports time-to-first-token.
+    """
+    started = time.perf_counter()
+    timer = StageTimer()
+    timer.begin("parse")
+    try:
+        chat_request = await _read_chat_request(request)
+    except HTTPException as e:
+        invalid = _invalid_request(e)
+        _observe("stream", None, "en", "error", timer, invalid)
+        return invalid
+    context_name = chat_request.context
+    question = chat_request.question
+    conversation_history = chat_request.conversation_history or []
+    timer.begin("language")
+    language = resolve_language(question, chat_request.language)
+    context_entry = None
+    session = None
+    release_slot = None
+
+    def single_event(event: str, data: dict) -> StreamingResponse:
+        async def events():
+            yield _sse_event(event, data)
+        return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    # Local tiers and cache hits are answered before the stream opens, so an LLM-bound
+    # request that admission control turns away can still get a real 429/503
+    try:
+        timer.begin("session")
+        session = _open_session(chat_request.session_id, conversation_history)
+        history = session.history() if session is not None else conversation_history
+        timer.begin("context")
+        context_entry = registry.get(context_name, language)
+        local_answer = _local_answer(context_name, question, language, context_entry.faq_handler, timer,
+                                     faq_search=context_entry.faq_search)
+        if local_answer is not None:
+            tier, local_response = local_answer
+            local_response.detected_language = language
+            payload = _record_turn(session, question, local_response).model_dump()
+            _observe("stream", context_entry, language, tier, timer, question=question)
+            return single_event("answer", {**payload, "tier": tier, "server_timing": timer.server_timing()})
+
+        timer.begin("cache")
+        cache_key = make_cache_key(context_name, language, question, history)
+        cached = answer_cache.get(cache_key) if answer_cache is not None else None
+        if cached is not None:
+            _observe("stream", context_entry, language, "cache", timer, question=question)
+            return single_event("answer", {**_record_turn(session, question, ChatResponse(
+                answer=cached,
+                context_used=context_name,
+                success=True,
+                detected_language=language
+            )).model_dump(), "tier": "cache", "server_timing": timer.server_timing()})
+
+        timer.begin("admission")
+        if admission is not None:
+            admission.acquire(client_id(request))
+            release_slot = _once(admission.release)
+    except AdmissionRejected as e:
+        rejected = _rejected(e, context_name, language, session)
+        _observe("stream", context_entry, language, "rejected", timer, rejected, question=question)
+        return rejected
+    except Exception as e:
+        _observe("stream", context_entry, language, "error", timer, question=question)
+        return single_event("error", {"context_used": context_name or "", "success": False, "error": str(e)})
+
+    async def event_stream():
+        try:
+            track_llm_usage()
+            timer.begin("llm")
+            messages = _build_messages(context_entry, history, question)
+            first_token_ms = None
+            tokens = []
+            async for token in llm_client.stream(messages):
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                tokens.append(token)
+                yield _sse_event("token", {"token": token})
+            answer = "".join(tokens)
+            if answer_cache is not None:
+                answer_cache.set(cache_key, answer)
+            if session is not None:
+                session.add_turn(question, answer)
+            _observe("stream", context_entry, language, "llm", timer, question=question, answer=answer)
+            yield _sse_event("done", {
+                "context_used": context_name,
+                "success": True,
+                "session_id": session.id if session is not None else None,
+                "detected_language": language,
+                "time_to_first_token_ms": first_token_ms,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                "server_timing": timer.server_timing()
+            })
+        except Exception as e:
+            _observe("stream", context_entry, language, "error", timer, question=question)
+            yield _sse_event("error", {
+                "context_used": context_name or "",
+                "success": False,
+                "error": str(e)
+            })
+        finally:
+            if release_slot is not None:
+                release_slot()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also runs when the client disconnects before the stream starts
+        background=BackgroundTask(release_slot) if release_slot is not None else None
+    )
+
+async def _ws_turn(websocket: WebSocket, context_name: str, declared_language: str, session, client: str,
+                   question: str):
+    """Answer one question on a WebSocket chat channel"""
+    started = time.perf_counter()
+    timer = StageTimer()
+    track_llm_usage()
+    context_entry = None
+    timer.begin("language")
+    language = resolve_language(question, declared_language)
+    try:
+        timer.begin("context")
+        context_entry = registry.get(context_name, language)
+        local_answer = _local_answer(context_name, question, language, context_entry.faq_handler, timer,
+                                     faq_search=context_entry.faq_search)
+        if local_answer is not None:
+            tier, local_response = local_answer
+            local_response.detected_language = language
+            payload = _record_turn(session, question, local_response).model_dump()
+            _observe("ws", context_entry, language, tier, timer, question=question)
+            await websocket.send_text(_ws_event("answer", {**payload, "tier": tier,
+                                                           "server_timing": timer.server_timing()}))
+            return
+
+        history = session.history()
+        timer.begin("cache")
+        cache_key = make_cache_key(context_name, language, question, history)
+        cached = answer_cache.get(cache_key) if answer_cache is not None else None
+        if cached is not None:
+            _observe("ws", context_entry, language, "cache", timer, question=question)
+            await websocket.send_text(_ws_event("answer", {**_record_turn(session, question, ChatResponse(
+                answer=cached,
+                context_used=context_name,
+                success=True,
+                detected_language=language
+            )).model_dump(), "tier": "cache", "server_timing": timer.server_timing()}))
+            return
+
+        timer.begin("admission")
+        with admit(client):
+            timer.begin("llm")
+            messages = _build_messages(context_entry, history, question)
+            first_token_ms = None
+            tokens = []
+            async for token in llm_client.stream(messages):
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                tokens.append(token)
+                await websocket.send_text(_ws_event("token", {"token": token}))
+        answer = "".join(tokens)
+        if answer_cache is not None:
+            answer_cache.set(cache_key, answer)
+        session.add_turn(question, answer)
+        _observe("ws", context_entry, language, "llm", timer, question=question, answer=answer)
+        await websocket.send_text(_ws_event("done", {
+            "context_used": context_name,
+            "success": True,
+            "session_id": session.id,
+            "detected_language": language,
+            "time_to_first_token_ms": first_token_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "server_timing": timer.server_timing()
+        }))
+    except AdmissionRejected as e:
+        _observe("ws", context_entry, language, "rejected", timer, question=question)
+        await websocket.send_text(_ws_event("error", {
+            "context_used": context_name or "",
+            "success": False,
+            "error": e.reason,
+            "status_code": e.status_code,
+            "retry_after": e.retry_after
+        }))
+    except WebSocketDisconnect:
+        _observe("ws", context_entry, language, "error", timer, question=question)
+        raise
+    except Exception as e:
+        _observe("ws", context_entry, language, "error", timer, question=question)
+        await websocket.send_text(_ws_event("error", {
+            "context_used": context_name or "",
+            "success": False,
+            "error": str(e)
+        }))
+
+
+@app.websocket("/chat/ws")
+async def chat_ws(websocket: WebSocket):
+    """
+    Persistent chat channel
+    The context, language and optional session_id are sent once as query parameters
+    (/chat/ws?context=presidents_fund&language=si); every turn then sends only
+    {"question": "..."} and the history is kept in a server-side session. A 'ready'
+    message carries the session id. Local and cached answers arrive as one 'answer'
+    message; LLM answers as 'token' messages followed by 'done'. The socket is closed
+    after WS_IDLE_TIMEOUT seconds without a question.
+    """
+    await websocket.accept()
+    if not socket_limiter.try_open():
+        # 1013: try again later
+        await websocket.close(code=1013, reason="Too many open connections")
+        return
+    try:
+        context_name = websocket.query_params.get("context")
+        language = websocket.query_params.get("language")
+        try:
+            session = _open_session(websocket.query_params.get("session_id", ""), [])
+        except ValueError as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+        client = client_id(websocket)
+        await websocket.send_text(_ws_event("ready", {
+            "session_id": session.id,
+            "context": context_name,
+            "language": language,
+            "idle_timeout": settings.ws_idle_timeout
+        }))
+
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_text(), settings.ws_idle_timeout or None)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1000, reason="Idle timeout")
+                return
+            try:
+                turn = ChatTurn.model_validate(orjson.loads(message))
+            except (ValueError, ValidationError):
+                await websocket.send_text(_ws_event("error", {
+                    "context_used": context_name or "",
+                    "success": False,
+                    "error": 'Each message must be a JSON object with a "question" of 1 to '
+                             f'{settings.chat_max_question_chars} characters.'
+                }))
+                continue
+            await _ws_turn(websocket, context_name, language, session, client, turn.question)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        socket_limiter.close()
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(batch: BatchChatRequest, request: Request):
+    """
+    Batch chat endpoint
+    Answers many (context, language, question) items in one request. Contexts are
+    resolved once per (context, language) group, local tiers are answered inline
+    and LLM-bound items run concurrently, at most BATCH_MAX_CONCURRENCY at a time.
+    Results come back in request order with per-item status and latency.
+    """
+    if len(batch.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch can contain at most {settings.batch_max_items} items."
         )
+    started = time.perf_counter()
+    entries = {}
+    for item in batch.items:
+        item.language = resolve_language(item.question, item.language)
+        key = (item.context.lower(), item.language)
+        if key not in entries:
+            entries[key] = registry.get(item.context, item.language)
+
+    results = [None] * len(batch.items)
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+    client = client_id(request)
+
+    def result_for(index: int, item_started: float, response: ChatResponse, tier: str) -> BatchChatResult:
+        response.detected_language = batch.items[index].language
+        return BatchChatResult(
+            index=index,
+            status="ok" if response.success else "unanswered",
+            status_code=status.HTTP_200_OK,
+            tier=tier,
+            latency_ms=round((time.perf_counter() - item_started) * 1000, 2),
+            **response.model_dump()
+        )
+
+    def failed_result(index: int, item: BatchChatItem, item_started: float, timer: StageTimer,
+                      e: Exception) -> BatchChatResult:
+        rejected = isinstance(e, AdmissionRejected)
+        _observe("batch", entries[(item.context.lower(), item.language)], item.language,
+                 "rejected" if rejected else "error", timer, question=item.question)
+        return BatchChatResult(
+            index=index,
+            answer="",
+            context_used=item.context,
+            success=False,
+            error=str(e),
+            detected_language=item.language,
+            status="error",
+            status_code=e.status_code if rejected else status.HTTP_502_BAD_GATEWAY,
+            tier="rejected" if rejected else "llm",
+            latency_ms=round((time.perf_counter() - item_started) * 1000, 2)
+        )
+
+    async def answer_with_llm(index: int, item: BatchChatItem, item_started: float, timer: StageTimer):
+        context_entry = entries[(item.context.lower(), item.language)]
+        try:
+            timer.begin("queue")
+            async with semaphore:
+                tier, answer = await _llm_answer(
+                    context_entry, item.context, item.language, item.question, item.conversation_history or [],
+                    timer, client
+                )
+            _observe("batch", context_entry, item.language, tier, timer, question=item.question, answer=answer)
+            response = ChatResponse(answer=answer, context_used=item.context, success=True)
+            results[index] = result_for(index, item_started, response, tier)
+        except Exception as e:
+            results[index] = failed_result(index, item, item_started, timer, e)
+
+    llm_items = []
+    for index, item in enumerate(batch.items):
+        item_started = time.perf_counter()
+        timer = StageTimer()
+        context_entry = entries[(item.context.lower(), item.language)]
+        local_answer = _local_answer(item.context, item.question, item.language, context_entry.faq_handler, timer,
+                                     faq_search=context_entry.faq_search)
+        if local_answer is not None:
+            tier, local_response = local_answer
+            _observe("batch", context_entry, item.language, tier, timer, question=item.question)
+            results[index] = result_for(index, item_started, local_response, tier)
+        else:
+            llm_items.append((index, item, item_started, timer))
+    # Each item that goes upstream is admitted on its own, like a /chat request; cache hits are free
+    await asyncio.gather(*(answer_with_llm(*args) for args in llm_items))
+
+    return ORJSONResponse(content=BatchChatResponse(
+        results=results,
+        total=len(results),
+        succeeded=sum(1 for result in results if result.success),
+        total_ms=round((time.perf_counter() - started) * 1000, 2)
+    ).model_dump())
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage latency, request outcomes and LLM usage for this worker"""
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Answer cache hit/miss counters and size"""
+    if answer_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **answer_cache.stats()}
+
+@app.get("/llm/stats")
+async def llm_stats():
+    """Upstream call counters, including coalesced waiters, and per-model breaker and latency state"""
+    return {
+        "coalescing": {"enabled": settings.llm_coalesce_requests, **llm_singleflight.stats()},
+        "admission": {"enabled": admission is not None, **(admission.stats() if admission is not None else {})},
+        "models": llm_client.stats(),
+    }
+
+@app.get("/querylog/stats")
+async def querylog_stats():
+    """Query log writer counters"""
+    if query_log is None:
+        return {"enabled": False}
+    return {"enabled": True, **query_log.stats()}
+
+@app.get("/contexts/stats")
+async def contexts_stats():
+    """Context data files, contexts currently loaded and their estimated memory, and load/eviction counters"""
+    return registry.stats()
+
+@app.get("/sessions/stats")
+async def sessions_stats():
+    """Server-side session store size and eviction counters, and open WebSocket chat channels"""
+    return {**session_store.stats(), "websockets": socket_limiter.stats()}
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Forget a server-side conversation"""
+    return {"deleted": session_store.delete(session_id)}
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,198 @@
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+# Seconds; fine-grained at the low end where the local tiers live
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+KNOWN_LANGUAGES = ("en", "si", "ta")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            # Per-bucket counts (last slot is +Inf), then sum
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Records how long each stage of a request took.
+    begin(stage) closes the running stage and starts the next; end() closes the last one.
+    """
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._stage = None
+
+    def begin(self, stage: str):
+        self.end()
+        self._stage = stage
+
+    def end(self):
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.stages[self._stage] = self.stages.get(self._stage, 0.0) + (now - self._last)
+            self._stage = None
+        self._last = now
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header, durations in milliseconds."""
+        entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total() * 1000:.3f}")
+        return ", ".join(entries)
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "chat_requests_total", "Chat requests by endpoint, context, language and answering tier",
+    ("endpoint", "context", "language", "outcome"))
+REQUEST_DURATION = registry.histogram(
+    "chat_request_duration_seconds", "End-to-end chat request latency",
+    ("endpoint", "context", "language", "outcome"))
+STAGE_DURATION = registry.histogram(
+    "chat_stage_duration_seconds", "Time spent in each stage of the chat pipeline",
+    ("stage", "context", "language"))
+LLM_REQUESTS = registry.counter(
+    "llm_requests_total", "Upstream LLM calls by model and outcome (ok, error, timeout, cancelled)",
+    ("model", "outcome"))
+LLM_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "Upstream LLM call latency",
+    ("model", "outcome"))
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "Tokens reported by the LLM backend",
+    ("model", "type"))
+
+
+def language_label(language: str) -> str:
+    return language if language in KNOWN_LANGUAGES else "other"
+
+
+def observe_request(endpoint: str, context: str, language: str, outcome: str, timer: StageTimer):
+    """Record one finished request and the stages it went through."""
+    language = language_label(language)
+    REQUESTS.inc(endpoint=endpoint, context=context, language=language, outcome=outcome)
+    REQUEST_DURATION.observe(timer.total(), endpoint=endpoint, context=context, language=language, outcome=outcome)
+    for stage, seconds in timer.stages.items():
+        STAGE_DURATION.observe(seconds, stage=stage, context=context, language=language)
+
+
+def observe_llm_call(model: str, outcome: str, seconds: float):
+    LLM_REQUESTS.inc(model=model, outcome=outcome)
+    LLM_DURATION.observe(seconds, model=model, outcome=outcome)
+
+
+# Tokens used by the request being handled: [prompt, completion]. Tasks started for it
+# (hedged calls, coalesced calls) copy the context and so add to the same list.
+_request_usage: ContextVar[Optional[list]] = ContextVar("request_usage", default=None)
+
+
+def track_llm_usage():
+    """Count LLM tokens for the current request (or WebSocket turn) from here on."""
+    _request_usage.set([0, 0])
+
+
+def llm_usage() -> Tuple[int, int]:
+    """(prompt, completion) tokens counted since track_llm_usage() in this context."""
+    usage = _request_usage.get()
+    return (usage[0], usage[1]) if usage is not None else (0, 0)
+
+
+def record_llm_usage(model: str, prompt_tokens: int, completion_tokens: int):
+    usage = _request_usage.get()
+    if usage is not None:
+        usage[0] += prompt_tokens or 0
+        usage[1] += completion_tokens or 0
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, model=model, type="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, model=model, type="completion")
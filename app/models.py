@@ -1,14 +1,59 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Optional, List, Literal
+from typing_extensions import Annotated, TypedDict
+
+from app.config import settings
+
+# Every entry point (/chat, /chat/stream, batch items, WebSocket turns) validates questions with this
+Question = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1,
+                                            max_length=settings.chat_max_question_chars)]
+
+class HistoryMessage(TypedDict):
+    # Validated into a plain dict, so history can be passed upstream as is
+    role: Literal["user", "assistant", "system"]
+    content: Annotated[str, StringConstraints(max_length=settings.chat_max_history_message_chars)]
+
+History = Annotated[List[HistoryMessage], Field(max_length=settings.chat_max_history_messages)]
 
 class ChatRequest(BaseModel):
-    context: str
-    question: str
-    conversation_history: Optional[List[dict]] = None
-    language: Optional[str] = "en"  # "en", "si", or "ta"
+    context: str = Field(max_length=100)
+    question: Question
+    conversation_history: Optional[History] = None
+    language: Optional[str] = Field(None, max_length=10)  # "en", "si", or "ta"; detected from the question when missing or wrong
+    session_id: Optional[str] = Field(None, max_length=128)  # server-side history instead of conversation_history
+    deadline: Optional[float] = Field(None, gt=0, le=120)  # latency budget in seconds, overrides ANSWER_DEADLINE
+
+class ChatTurn(BaseModel):
+    question: Question  # one message on the /chat/ws channel
 
 class ChatResponse(BaseModel):
     answer: str
     context_used: str
     success: bool
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+    session_id: Optional[str] = None
+    detected_language: Optional[str] = None  # language the question was answered in
+    related_questions: Optional[List[str]] = None  # FAQ questions to suggest next, when a keyword rule answered
+    degraded: bool = False  # local fallback answer, given because the LLM missed the deadline or failed
+
+class BatchChatItem(BaseModel):
+    context: str = Field(max_length=100)
+    question: Question
+    language: Optional[str] = Field(None, max_length=10)
+    conversation_history: Optional[History] = None
+
+class BatchChatRequest(BaseModel):
+    items: List[BatchChatItem]
+
+class BatchChatResult(ChatResponse):
+    index: int
+    status: str  # "ok", "unanswered" (moderation or FAQ miss) or "error"
+    status_code: int
+    tier: str  # "moderation", "greeting", "common_question", "faq", "cache", "llm" or "rejected"
+    latency_ms: float
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatResult]
+    total: int
+    succeeded: int
+    total_ms: float
\ No newline at end of file
@@ -0,0 +1,54 @@
+import os
+from typing import List
+
+from app.automaton import Automaton
+from app.config import settings
+from app.text import fold_text
+
+DEFAULT_WORDS_FILE = os.path.join(os.path.dirname(__file__), "data", "bad_words.txt")
+
+MODERATION_MESSAGES = {
+    "en": {
+        "answer": "I cannot process requests containing inappropriate language. Please rephrase your question respectfully.",
+        "error": "Inappropriate language detected. Please use respectful language when asking questions."
+    },
+    "si": {
+        "answer": "අනුචිත භාෂාව සහිත ඉල්ලීම් මට සැකසිය නොහැක. කරුණාකර ඔබගේ ප්‍රශ්නය ගෞරවනීය ලෙස නැවත ප්‍රකාශ කරන්න.",
+        "error": "අනුචිත භාෂාව අනාවරණය විය. ප්‍රශ්න ඇසීමේදී කරුණාකර ගෞරවනීය භාෂාව භාවිතා කරන්න."
+    },
+    "ta": {
+        "answer": "பொருத்தமற்ற மொழியைக் கொண்ட கோரிக்கைகளை என்னால் செயலாக்க முடியாது. தயவுசெய்து உங்கள் கேள்வியை மரியாதையுடன் மறுபரிசீலனை செய்யுங்கள்.",
+        "error": "பொருத்தமற்ற மொழி கண்டறியப்பட்டது. கேள்விகள் கேட்கும்போது தயவுசெய்து மரியாதையான மொழியைப் பயன்படுத்துங்கள்."
+    }
+}
+
+
+def load_words(path: str) -> List[str]:
+    """Read one term per line; blank lines and '#' comments are ignored."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+class Moderator:
+    """
+    Inappropriate-language filter for English, Sinhala and Tamil.
+    The word list is compiled once into an Aho-Corasick automaton and each
+    question is scanned in a single pass.
+    """
+
+    def __init__(self, words: List[str]):
+        self.automaton = Automaton(fold_text(word) for word in words)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Moderator":
+        return cls(load_words(path))
+
+    def scan(self, text: str) -> List[str]:
+        """Return the distinct terms found in text, in order of first occurrence."""
+        return list(dict.fromkeys(pattern for _, pattern in self.automaton.find_all(fold_text(text))))
+
+    def is_inappropriate(self, text: str) -> bool:
+        return self.automaton.contains_any(fold_text(text))
+
+
+moderator = Moderator.from_file(settings.moderation_words_file or DEFAULT_WORDS_FILE)
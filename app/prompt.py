@@ -0,0 +1,94 @@
+import logging
+from typing import Callable, List, Mapping, Sequence
+
+from app.retrieval import NgramIndex
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate: about four UTF-8 bytes per token. Sinhala and
+    Tamil characters are three bytes each, which roughly matches how
+    byte-level BPE tokenizers split them.
+    """
+    return max(1, len(text.encode("utf-8")) // 4) if text else 0
+
+
+def _faq_text(faq: dict) -> str:
+    answers = [faq["answer"]] if "answer" in faq else faq.get("answers", [])
+    return f"Q: {faq['question']}\nA: " + " ".join(answers)
+
+
+def split_chunks(context_info: str, chunk_tokens: int) -> List[str]:
+    """Group consecutive lines of context_info into chunks of about chunk_tokens."""
+    chunks, current, current_tokens = [], [], 0
+    for line in context_info.splitlines():
+        line = line.rstrip()
+        if not line.strip():
+            continue
+        line_tokens = estimate_tokens(line)
+        if current and current_tokens + line_tokens > chunk_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def prompt_chunks(context: Mapping, chunk_tokens: int) -> List[str]:
+    """context_info lines grouped into chunks of about chunk_tokens, then one chunk per FAQ."""
+    chunks = split_chunks(context.get("context_info", ""), chunk_tokens)
+    chunks.extend(_faq_text(faq) for faq in context.get("faqs", []))
+    return chunks
+
+
+class PromptChunks:
+    """
+    A CONTEXT split once into retrievable chunks: context_info lines grouped
+    into chunks plus one chunk per FAQ. select() picks the chunks most
+    relevant to a question under a token budget. index_for gives the chunks'
+    NgramIndex (app.knowledge.prompt_index_for maps it from the compiled
+    artifact); by default it is built here.
+    """
+
+    def __init__(self, context: Mapping, chunk_tokens: int,
+                 index_for: Callable[[Sequence[str]], NgramIndex] = NgramIndex):
+        self.system_prompt = context.get("system_prompt", "")
+        self.chunks = prompt_chunks(context, chunk_tokens)
+        self.chunk_tokens = [estimate_tokens(chunk) for chunk in self.chunks]
+        self.total_tokens = sum(self.chunk_tokens)
+        self.index = index_for(self.chunks)
+
+    def select(self, question: str, top_k: int, token_budget: int) -> List[str]:
+        """Top-k relevant chunks that fit in token_budget, in their original order."""
+        if self.total_tokens <= token_budget:
+            return self.chunks
+        ranked = [chunk_id for chunk_id, score in self.index.search(question, top_k) if score > 0]
+        if not ranked:
+            # Nothing relevant: keep the leading general information
+            ranked = range(len(self.chunks))
+        selected, used = [], 0
+        for chunk_id in ranked:
+            if len(selected) >= top_k:
+                break
+            if used + self.chunk_tokens[chunk_id] > token_budget:
+                continue
+            selected.append(chunk_id)
+            used += self.chunk_tokens[chunk_id]
+        return [self.chunks[chunk_id] for chunk_id in sorted(selected)]
+
+    def build_system_message(self, question: str, top_k: int, token_budget: int, label: str = "") -> str:
+        selected = self.select(question, top_k, token_budget)
+        content = f"{self.system_prompt}\n\nContext Information:\n" + "\n\n".join(selected)
+        logger.info(
+            "Prompt tokens%s: %d -> %d (%d of %d chunks)",
+            f" for {label}" if label else "",
+            estimate_tokens(self.system_prompt) + self.total_tokens,
+            estimate_tokens(content),
+            len(selected),
+            len(self.chunks),
+        )
+        return content
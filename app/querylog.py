@@ -0,0 +1,133 @@
+"""
+Append-only query log: one JSON line per answered question with its context,
+language, normalized question, answering tier, latency and LLM token counts
+(plus the answer for LLM answers, as a starting point for new FAQ entries).
+
+Handlers only append to an in-memory list; a background task writes the
+records in batches every QUERY_LOG_FLUSH_INTERVAL seconds, or sooner once
+QUERY_LOG_BATCH_SIZE are waiting. Each batch is a single O_APPEND write, so
+several workers can share one file. When the writer falls behind by more than
+QUERY_LOG_MAX_PENDING records, new records are dropped and counted rather than
+slowing requests down.
+
+The log feeds the offline FAQ miner (python -m app.faq_miner).
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Iterator, List, Optional
+
+import orjson
+
+from app.config import settings
+from app.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLog:
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def record(self, record: dict):
+        """Queue one record; never blocks."""
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self):
+        """Write queued records until cancelled, then write whatever is left."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                batch = self._take()
+                if batch:
+                    await asyncio.to_thread(self._write, batch)
+        finally:
+            self._wakeup = None
+            self.flush()
+
+    def flush(self):
+        """Write queued records synchronously (used on shutdown)."""
+        batch = self._take()
+        if batch:
+            self._write(batch)
+
+    def _take(self) -> List[dict]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _write(self, batch: List[dict]):
+        data = b"".join(orjson.dumps(record) + b"\n" for record in batch)
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            self.written += len(batch)
+        except OSError as e:
+            self.errors += 1
+            logger.warning("Could not write %d query log records to %s: %s", len(batch), self.path, e)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+def read_log(path: str) -> Iterator[dict]:
+    """Records of a query log file; lines that do not parse (e.g. a torn last line) are skipped."""
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+
+
+def make_record(endpoint: str, context: str, language: str, question: str, tier: str, latency_ms: float,
+                prompt_tokens: int = 0, completion_tokens: int = 0, answer: str = None) -> dict:
+    record = {
+        "ts": round(time.time(), 3),
+        "endpoint": endpoint,
+        "context": context,
+        "language": language,
+        "question": normalize_text(question),
+        "tier": tier,
+        "latency_ms": latency_ms,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+    }
+    if answer is not None:
+        record["answer"] = answer
+    return record
+
+
+query_log = QueryLog(
+    settings.query_log_path,
+    batch_size=settings.query_log_batch_size,
+    flush_interval=settings.query_log_flush_interval,
+    max_pending=settings.query_log_max_pending,
+) if settings.query_log_path else None
@@ -0,0 +1,146 @@
+import heapq
+import math
+from array import array
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+from app.text import char_ngrams
+
+
+class NgramIndex:
+    """
+    TF-IDF index over character trigrams with cosine scoring.
+
+    Everything is stored in flat typed arrays:
+      - postings: doc ids per gram, sliced by post_offsets
+      - forward: (gram id, weight) per doc, sliced by doc_offsets
+    A query first collects candidates from its rarest grams, stopping once
+    `max_candidates` is reached, and then scores only those candidates
+    exactly. Query cost therefore depends on how selective the question is,
+    not on how many documents are indexed.
+    """
+
+    def __init__(self, documents: Sequence[str], n: int = 3, max_candidates: int = 64):
+        self.n = n
+        self.max_candidates = max_candidates
+        self.size = len(documents)
+
+        doc_grams = [Counter(char_ngrams(doc, n)) for doc in documents]
+        df = Counter()
+        for grams in doc_grams:
+            df.update(grams.keys())
+
+        self.vocab = {gram: gram_id for gram_id, gram in enumerate(sorted(df))}
+        self.df = array("I", (df[gram] for gram in sorted(df)))
+        self.idf = array("f", (self._idf(count) for count in self.df))
+        self.unknown_idf = self._idf(0)
+
+        postings = [[] for _ in self.vocab]
+        self.doc_offsets = array("I", [0])
+        self.forward_grams = array("I")
+        self.forward_weights = array("f")
+        for doc_id, grams in enumerate(doc_grams):
+            weights = {
+                self.vocab[gram]: (1 + math.log(tf)) * self.idf[self.vocab[gram]]
+                for gram, tf in grams.items()
+            }
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for gram_id in sorted(weights):
+                postings[gram_id].append(doc_id)
+                self.forward_grams.append(gram_id)
+                self.forward_weights.append(weights[gram_id] / norm)
+            self.doc_offsets.append(len(self.forward_grams))
+
+        self.post_offsets = array("I", [0])
+        self.postings = array("I")
+        for doc_ids in postings:
+            self.postings.extend(doc_ids)
+            self.post_offsets.append(len(self.postings))
+
+    @classmethod
+    def from_arrays(cls, n: int, size: int, vocab, df, idf, post_offsets, postings, doc_offsets,
+                    forward_grams, forward_weights, max_candidates: int = 64) -> "NgramIndex":
+        """
+        Wrap prebuilt index data without recomputing it. Any objects with the
+        same indexing behaviour as the arrays work, e.g. memoryviews over an
+        mmap'd file; vocab only needs a get(gram) method.
+        """
+        index = cls.__new__(cls)
+        index.n = n
+        index.max_candidates = max_candidates
+        index.size = size
+        index.vocab = vocab
+        index.df = df
+        index.idf = idf
+        index.unknown_idf = index._idf(0)
+        index.post_offsets = post_offsets
+        index.postings = postings
+        index.doc_offsets = doc_offsets
+        index.forward_grams = forward_grams
+        index.forward_weights = forward_weights
+        return index
+
+    def _idf(self, df: int) -> float:
+        return math.log((self.size + 1) / (df + 1)) + 1
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Return up to k (doc id, cosine score) pairs, best first."""
+        query_weights = {}
+        norm2 = 0.0
+        for gram, tf in Counter(char_ngrams(query, self.n)).items():
+            gram_id = self.vocab.get(gram)
+            weight = (1 + math.log(tf)) * (self.idf[gram_id] if gram_id is not None else self.unknown_idf)
+            norm2 += weight * weight
+            if gram_id is not None:
+                query_weights[gram_id] = weight
+        if not query_weights:
+            return []
+
+        candidates = set()
+        for gram_id in sorted(query_weights, key=self.df.__getitem__):
+            start, end = self.post_offsets[gram_id], self.post_offsets[gram_id + 1]
+            if candidates and len(candidates) + (end - start) > self.max_candidates:
+                break
+            candidates.update(self.postings[start:end])
+
+        norm = math.sqrt(norm2)
+        scored = []
+        for doc_id in candidates:
+            start, end = self.doc_offsets[doc_id], self.doc_offsets[doc_id + 1]
+            dot = sum(
+                query_weights.get(gram_id, 0.0) * weight
+                for gram_id, weight in zip(self.forward_grams[start:end], self.forward_weights[start:end])
+            )
+            scored.append((dot / norm, doc_id))
+        return [(doc_id, score) for score, doc_id in heapq.nlargest(k, scored)]
+
+
+def faq_answer(faq: dict) -> Optional[str]:
+    """An FAQ entry has either a single 'answer' or a list of 'answers'; return the first."""
+    if "answer" in faq:
+        return faq["answer"]
+    if faq.get("answers"):
+        return faq["answers"][0]
+    return None
+
+
+class FaqIndex:
+    """
+    Retrieval index over the questions of one (context, language) FAQ list.
+    Built once per context; search() returns the top-k FAQs with scores.
+    """
+
+    def __init__(self, faqs: Sequence[dict], min_score: float = 0.5, index: NgramIndex = None):
+        self.faqs = list(faqs)
+        self.min_score = min_score
+        self.index = index if index is not None else NgramIndex([faq["question"] for faq in self.faqs])
+
+    def search(self, question: str, k: int = 3) -> List[Tuple[dict, float]]:
+        return [(self.faqs[doc_id], score) for doc_id, score in self.index.search(question, k)]
+
+    def best_answer(self, question: str) -> Optional[str]:
+        """Answer of the best matching FAQ, or None if nothing scores above min_score."""
+        matches = self.search(question, k=1)
+        if matches and matches[0][1] >= self.min_score:
+            return faq_answer(matches[0][0])
+        return None
@@ -0,0 +1,122 @@
+import re
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.config import settings
+from app.prompt import estimate_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s")
+
+
+def _first_sentence(text: str, max_chars: int = 160) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars].rstrip() + "..."
+
+
+class Session:
+    """
+    Conversation state kept on the server between /chat calls.
+    Recent turns are kept verbatim; older turns are folded into a short
+    extractive summary so the prompt stays under a token budget.
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.messages: List[dict] = []
+        self.summary: List[str] = []
+        self.last_seen = time.monotonic()
+
+    def history(self) -> List[dict]:
+        """Messages to send upstream: the summary (if any) followed by recent turns."""
+        if not self.summary:
+            return list(self.messages)
+        summary = {"role": "system", "content": "Summary of the earlier conversation:\n" + "\n".join(self.summary)}
+        return [summary] + self.messages
+
+    def add_turn(self, question: str, answer: str):
+        self.messages.append({"role": "user", "content": question})
+        self.messages.append({"role": "assistant", "content": answer})
+        self.compact()
+
+    def compact(self, history_budget: int = None, summary_budget: int = None):
+        history_budget = history_budget or settings.session_history_token_budget
+        summary_budget = summary_budget or settings.session_summary_token_budget
+        tokens = sum(estimate_tokens(m.get("content", "")) for m in self.messages)
+        # Always keep the latest exchange verbatim
+        while tokens > history_budget and len(self.messages) > 2:
+            message = self.messages.pop(0)
+            tokens -= estimate_tokens(message.get("content", ""))
+            self.summary.append(f"{message.get('role', 'user')}: {_first_sentence(message.get('content', ''))}")
+        while len(self.summary) > 1 and sum(estimate_tokens(line) for line in self.summary) > summary_budget:
+            self.summary.pop(0)
+
+    def tokens(self) -> int:
+        return sum(estimate_tokens(m.get("content", "")) for m in self.history())
+
+
+class SessionStore:
+    """
+    Bounded in-process session store.
+    Sessions are kept in least-recently-used order; idle sessions expire after
+    idle_timeout seconds and the oldest are evicted beyond max_sessions.
+    """
+
+    def __init__(self, max_sessions: int, idle_timeout: float):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _expire(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen <= self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def get_or_create(self, session_id: Optional[str], seed_history: Optional[list] = None) -> Session:
+        """Return the session for session_id, creating it (and minting an id if empty)."""
+        now = time.monotonic()
+        self._expire(now)
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None:
+            session = Session(session_id or uuid.uuid4().hex)
+            if seed_history:
+                session.messages = [
+                    {"role": m.get("role", "user"), "content": m.get("content", "")}
+                    for m in seed_history if isinstance(m, dict)
+                ]
+                session.compact()
+            self._sessions[session.id] = session
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._sessions.move_to_end(session.id)
+        session.last_seen = now
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "created": self.created,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+session_store = SessionStore(
+    max_sessions=settings.session_max_sessions,
+    idle_timeout=settings.session_idle_timeout,
+)
@@ -0,0 +1,97 @@
+import re
+import unicodedata
+from typing import NamedTuple, Optional
+
+# Python's \w does not cover Sinhala/Tamil vowel signs, so the script blocks are listed explicitly
+_TOKEN_RE = re.compile(r"[\w\u0B80-\u0BFF\u0D80-\u0DFF]+")
+_JOINERS_RE = re.compile("[\u200b\u200c\u200d\ufeff]")
+
+
+def fold_text(text: str) -> str:
+    """NFC, lowercase and zero-width joiners removed; punctuation is kept."""
+    return _JOINERS_RE.sub("", unicodedata.normalize("NFC", text or "")).lower()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a question for matching across English, Sinhala and Tamil:
+    folded as in fold_text(), with punctuation collapsed to single spaces.
+    """
+    return " ".join(_TOKEN_RE.findall(fold_text(text)))
+
+
+def tokenize(text: str) -> list:
+    """Split normalized text into words."""
+    return normalize_text(text).split()
+
+
+def char_ngrams(text: str, n: int = 3) -> list:
+    """
+    Character n-grams of every word, padded with spaces so word boundaries count.
+    Works on code points, so it is script independent.
+    """
+    grams = []
+    for word in tokenize(text):
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams.append(padded)
+            continue
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+# Each letter of a script is translated to that script's marker character and
+# everything else is left alone, so one str.translate() pass plus three C-level
+# counts give the script mix. Control characters that double as markers are dropped.
+_LATIN, _SINHALA, _TAMIL = "\x01", "\x02", "\x03"
+_SCRIPT_TABLE = {ord(marker): None for marker in (_LATIN, _SINHALA, _TAMIL)}
+_SCRIPT_TABLE.update((code, _LATIN) for code in range(ord("A"), ord("Z") + 1))
+_SCRIPT_TABLE.update((code, _LATIN) for code in range(ord("a"), ord("z") + 1))
+_SCRIPT_TABLE.update((code, _SINHALA) for code in range(0x0D80, 0x0E00))
+_SCRIPT_TABLE.update((code, _TAMIL) for code in range(0x0B80, 0x0C00))
+
+SCRIPT_LANGUAGES = {"latin": "en", "sinhala": "si", "tamil": "ta"}
+_LANGUAGE_SCRIPTS = {language: script for script, language in SCRIPT_LANGUAGES.items()}
+
+
+class ScriptProfile(NamedTuple):
+    latin: int
+    sinhala: int
+    tamil: int
+
+    @property
+    def total(self) -> int:
+        return self.latin + self.sinhala + self.tamil
+
+    def has(self, language: str) -> bool:
+        """True if the text contains any letter of the language's script."""
+        return getattr(self, _LANGUAGE_SCRIPTS[language]) > 0
+
+    def dominant(self) -> Optional[str]:
+        """Language of the script with the most letters, or None if there are no letters."""
+        if not self.total:
+            return None
+        # Ties go to Sinhala/Tamil: a few Latin letters in a native-script question are usually names
+        script = max(("sinhala", "tamil", "latin"), key=lambda name: getattr(self, name))
+        return SCRIPT_LANGUAGES[script]
+
+
+def script_profile(text: str) -> ScriptProfile:
+    """Count the Latin, Sinhala and Tamil letters in text in a single pass."""
+    marked = (text or "").translate(_SCRIPT_TABLE)
+    return ScriptProfile(marked.count(_LATIN), marked.count(_SINHALA), marked.count(_TAMIL))
+
+
+def resolve_language(text: str, declared: Optional[str] = None) -> str:
+    """
+    Language to answer in. The declared language is kept when the text contains
+    its script (or has no letters at all) and languages without a script profile
+    are passed through; otherwise, including when nothing was declared, the
+    dominant script decides.
+    """
+    profile = script_profile(text)
+    if declared and declared not in _LANGUAGE_SCRIPTS:
+        return declared
+    if declared and (profile.has(declared) or not profile.total):
+        return declared
+    return profile.dominant() or "en"
@@ -0,0 +1,100 @@
+"""
+FAQ retrieval scaling benchmark.
+
+Generates synthetic English, Sinhala and Tamil FAQ lists of growing size and
+compares per-query latency of app.retrieval.FaqIndex against the old
+difflib.get_close_matches linear scan.
+
+    python -m benchmarks.bench_faq_index
+    python -m benchmarks.bench_faq_index --sizes 10 100 1000 10000 --queries 200
+"""
+import argparse
+import difflib
+import random
+import time
+
+from app.retrieval import FaqIndex
+
+# Syllables per script; words are built from these so n-gram statistics resemble real text
+SYLLABLES = {
+    "en": ["ap", "pli", "ca", "tion", "me", "di", "cal", "fund", "pa", "tient", "sur", "ge", "ry",
+           "of", "fi", "ce", "pay", "ment", "bill", "re", "im", "burse", "el", "i", "gi", "ble"],
+    "si": ["අ", "ය", "දු", "ම්", "ප", "ත්", "ර", "වෛ", "ද්", "ය", "ආ", "ධා", "ශ", "ල්", "ක", "ර්",
+           "මය", "රෝ", "හ", "ගෙ", "වී", "මු", "දල", "කා", "ර්යා", "ලය"],
+    "ta": ["வி", "ண்", "ண", "ப்", "ப", "ம", "ரு", "த்", "து", "வ", "உ", "த", "வி", "நி", "தி",
+           "யம்", "அ", "று", "வை", "சி", "கி", "ச்", "சை", "பண", "ம்", "செ"],
+}
+
+
+def make_vocabulary(language: str, size: int, rng: random.Random) -> list:
+    syllables = SYLLABLES[language]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_faqs(language: str, count: int, rng: random.Random) -> list:
+    vocabulary = make_vocabulary(language, max(200, count * 2), rng)
+    # Zipf-like word frequencies, as in real question text
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    faqs = []
+    for i in range(count):
+        words = rng.choices(vocabulary, weights=weights, k=rng.randint(6, 14))
+        faqs.append({"question": " ".join(words) + "?", "answer": f"answer {i}"})
+    return faqs
+
+
+def perturb(question: str, rng: random.Random) -> str:
+    words = question.rstrip("?").split()
+    if len(words) > 3:
+        words.pop(rng.randrange(len(words)))
+    return " ".join(words)
+
+
+def time_per_call(fn, queries) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--difflib-max", type=int, default=1000, help="skip the difflib baseline above this size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'lang':<5}{'faqs':>7}{'build ms':>10}{'index us':>10}{'difflib us':>12}{'top1 hit':>10}")
+    for language in SYLLABLES:
+        for size in args.sizes:
+            rng = random.Random(args.seed)
+            faqs = make_faqs(language, size, rng)
+            targets = [rng.randrange(size) for _ in range(args.queries)]
+            queries = [perturb(faqs[t]["question"], rng) for t in targets]
+
+            started = time.perf_counter()
+            index = FaqIndex(faqs)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            index_us = time_per_call(lambda q: index.search(q, k=5), queries)
+            hits = sum(
+                1 for query, target in zip(queries, targets)
+                if (result := index.search(query, k=1)) and result[0][0] is faqs[target]
+            )
+
+            difflib_us = float("nan")
+            if size <= args.difflib_max:
+                questions = [faq["question"] for faq in faqs]
+                difflib_us = time_per_call(
+                    lambda q: difflib.get_close_matches(q, questions, n=1, cutoff=0.6), queries
+                )
+
+            print(f"{language:<5}{size:>7}{build_ms:>10.1f}{index_us:>10.1f}{difflib_us:>12.1f}"
+                  f"{hits / len(queries):>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Microbenchmarks for the presidents_fund* FAQ and keyword matchers at scale.
+
+For English, Sinhala and Tamil the context's FAQ list is padded with synthetic
+FAQs (built as in bench_faq_index) up to each size, and then:
+
+  - get_faq_answer is timed per call on q-and-a.txt questions (hits) and on
+    off-topic questions that fall through to the keyword matcher (misses)
+  - the context's keyword rules are padded with synthetic rules up to each
+    size; KeywordRules.match is timed on both query sets and
+    get_contextual_answer on the off-topic ones (their cost should not grow)
+  - memory: tracemalloc size of the FAQ index, and peak allocation during calls
+  - accuracy: share of q-and-a.txt questions, verbatim and with a word dropped,
+    that get_faq_answer answers with their own answer
+
+Limits in benchmarks/matcher_thresholds.json (max us per call, max index KiB,
+min accuracy per matcher, language and size) are checked after the run; any
+breach is listed and the run exits with status 1.
+
+    python -m benchmarks.bench_matchers
+    python -m benchmarks.bench_matchers --sizes 10 1000 --queries 100
+    python -m benchmarks.bench_matchers --update-thresholds   # record this run with 2x headroom
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from app.contexts.registry import registry
+from app.keyword_rules import KeywordRules
+from app.retrieval import FaqIndex
+from app.text import normalize_text
+from benchmarks.bench_faq_index import make_faqs, make_vocabulary, perturb
+from benchmarks.workload import load_qa_pairs
+
+THRESHOLDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "matcher_thresholds.json")
+CONTEXTS = {"en": "presidents_fund", "si": "presidents_fund_si", "ta": "presidents_fund_ta"}
+
+
+def time_per_call(fn, queries, repeat: int = 3) -> float:
+    """Best of `repeat` runs over the queries, in microseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            fn(query)
+        best = min(best, time.perf_counter() - started)
+    return best / len(queries) * 1e6
+
+
+def peak_kib(fn, queries) -> float:
+    """Peak memory allocated while answering the queries, in KiB."""
+    gc.collect()
+    tracemalloc.start()
+    for query in queries:
+        fn(query)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def build_index(faqs: list):
+    """The FaqIndex and the KiB it holds on to."""
+    gc.collect()
+    tracemalloc.start()
+    index = FaqIndex(faqs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, size / 1024
+
+
+def off_topic_questions(language: str, count: int, rng: random.Random) -> list:
+    """Synthetic questions from a separate vocabulary, so they match no FAQ."""
+    return [perturb(faq["question"], rng) for faq in make_faqs(language, count, random.Random(rng.random()))]
+
+
+def keyword_rules(data: dict, language: str, size: int, rng: random.Random) -> KeywordRules:
+    """The context's keyword rules plus synthetic ones (four keywords each) up to `size` rules."""
+    rules = data.get("keyword_rules", [])
+    count = max(0, size - len(rules))
+    vocabulary = make_vocabulary(language, max(200, count * 4), rng)
+    synthetic = [{"keywords": rng.sample(vocabulary, 4), "answer": f"synthetic rule {i}"} for i in range(count)]
+    return KeywordRules(rules + synthetic, data.get("general_keywords", ()), data.get("general_answer"))
+
+
+def accuracy(get_faq_answer, pairs: list, rng: random.Random) -> float:
+    hits = total = 0
+    for pair in pairs:
+        expected = normalize_text(pair["answer"])
+        for question in (pair["question"], perturb(pair["question"], rng)):
+            total += 1
+            hits += normalize_text(get_faq_answer(question) or "") == expected
+    return hits / total if total else 1.0
+
+
+def run(sizes, queries: int, seed: int) -> dict:
+    """Results keyed by 'matcher/language/size'."""
+    qa_pairs = load_qa_pairs()
+    results = {}
+    print(f"{'matcher':<24}{'lang':<5}{'size':>7}{'hit us':>9}{'miss us':>9}{'index KiB':>11}"
+          f"{'peak KiB':>10}{'accuracy':>10}")
+    for language, context_name in CONTEXTS.items():
+        context = registry.context(context_name)
+        original_index = context.faq_index
+        original_rules = context.keyword_rules
+        real_faqs = context.context["faqs"]
+        pairs = [pair for pair in qa_pairs if pair["language"] == language]
+        try:
+            for size in sizes:
+                rng = random.Random(seed)
+                synthetic = make_faqs(language, max(0, size - len(real_faqs)), rng) if size > len(real_faqs) else []
+                faqs = real_faqs + synthetic
+                context.faq_index, index_kib = build_index(faqs)
+
+                hit_queries = [pair["question"] for pair in pairs] * max(1, queries // max(1, len(pairs)))
+                miss_queries = off_topic_questions(language, queries, rng)
+
+                faq_result = {
+                    "hit_us": time_per_call(context.get_faq_answer, hit_queries),
+                    "miss_us": time_per_call(context.get_faq_answer, miss_queries),
+                    "index_kib": index_kib,
+                    "peak_kib": peak_kib(context.get_faq_answer, hit_queries + miss_queries),
+                    "accuracy": accuracy(context.get_faq_answer, pairs, rng),
+                }
+                rules = keyword_rules(context.context, language, size, rng)
+                rules_result = {
+                    "hit_us": time_per_call(rules.match, hit_queries),
+                    "miss_us": time_per_call(rules.match, miss_queries),
+                }
+                # The keyword matcher is called with the lowercased question, as get_faq_answer does
+                context.keyword_rules = rules
+                lowered = [question.lower() for question in miss_queries]
+                contextual_result = {
+                    "miss_us": time_per_call(context.get_contextual_answer, lowered),
+                    "peak_kib": peak_kib(context.get_contextual_answer, lowered),
+                }
+                context.keyword_rules = original_rules
+                results[f"get_faq_answer/{language}/{size}"] = faq_result
+                results[f"get_contextual_answer/{language}/{size}"] = contextual_result
+                results[f"keyword_rules/{language}/{size}"] = rules_result
+                print(f"{'get_faq_answer':<24}{language:<5}{len(faqs):>7}{faq_result['hit_us']:>9.1f}"
+                      f"{faq_result['miss_us']:>9.1f}{index_kib:>11.1f}{faq_result['peak_kib']:>10.1f}"
+                      f"{faq_result['accuracy']:>10.1%}")
+                print(f"{'get_contextual_answer':<24}{language:<5}{len(rules):>7}{'':>9}"
+                      f"{contextual_result['miss_us']:>9.1f}{'':>11}{contextual_result['peak_kib']:>10.1f}")
+                print(f"{'keyword_rules':<24}{language:<5}{len(rules):>7}{rules_result['hit_us']:>9.1f}"
+                      f"{rules_result['miss_us']:>9.1f}")
+        finally:
+            context.faq_index = original_index
+            context.keyword_rules = original_rules
+    return results
+
+
+def check(results: dict, thresholds: dict) -> list:
+    """Threshold breaches as readable lines; keys missing from the run are skipped."""
+    failures = []
+    for key, limits in sorted(thresholds.items()):
+        result = results.get(key)
+        if result is None:
+            continue
+        for metric in ("hit_us", "miss_us", "index_kib", "peak_kib"):
+            limit = limits.get(f"max_{metric}")
+            if limit is not None and result.get(metric, 0.0) > limit:
+                failures.append(f"{key}: {metric} {result[metric]:.1f} > {limit}")
+        limit = limits.get("min_accuracy")
+        if limit is not None and result.get("accuracy", 1.0) < limit:
+            failures.append(f"{key}: accuracy {result['accuracy']:.1%} < {limit:.1%}")
+    return failures
+
+
+def thresholds_from(results: dict, headroom: float) -> dict:
+    thresholds = {}
+    for key, result in results.items():
+        limits = {f"max_{metric}": round(result[metric] * headroom, 1)
+                  for metric in ("hit_us", "miss_us", "index_kib", "peak_kib") if metric in result}
+        if "accuracy" in result:
+            limits["min_accuracy"] = round(result["accuracy"], 3)
+        thresholds[key] = limits
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE)
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="write this run's numbers (times --headroom) as the new thresholds")
+    parser.add_argument("--headroom", type=float, default=2.0)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.queries, args.seed)
+
+    if args.update_thresholds:
+        with open(args.thresholds, "w", encoding="utf-8") as f:
+            json.dump(thresholds_from(results, args.headroom), f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nThresholds written to {args.thresholds}")
+        return
+    if not os.path.exists(args.thresholds):
+        print(f"\nNo thresholds at {args.thresholds}; run with --update-thresholds to record them")
+        return
+    with open(args.thresholds, encoding="utf-8") as f:
+        failures = check(results, json.load(f))
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll matchers within thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+/chat request decoding and response encoding benchmark.
+
+Compares, per request, the old path (json.loads of the body, field access with
+dict.get, then FastAPI's response_model serialization and JSONResponse) with the
+typed path (orjson.loads and ChatRequest.model_validate with the size caps,
+then ORJSONResponse) for short, history-carrying and near-limit payloads.
+
+    python -m benchmarks.bench_request_codec
+    python -m benchmarks.bench_request_codec --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import orjson
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.config import settings
+from app.models import ChatRequest, ChatResponse
+
+SI_QUESTION = "අයදුම්පත ලබා ගත හැක්කේ කොහෙන්ද?"
+SI_ANSWER = "අයදුම්පත ජනාධිපති අරමුදලේ වෙබ් අඩවියෙන් බාගත කළ හැකිය. " * 8
+
+
+def history(turns: int, text: str) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"{text} {i}"})
+        messages.append({"role": "assistant", "content": f"{text} {i} " * 6})
+    return messages
+
+
+PAYLOADS = {
+    "short en": (
+        {"context": "presidents_fund", "question": "How can I apply for financial assistance?"},
+        "To apply for financial assistance from the President's Fund, download the application form. " * 3,
+    ),
+    "si + 10 turns": (
+        {"context": "presidents_fund", "question": SI_QUESTION, "language": "si",
+         "conversation_history": history(5, SI_QUESTION)},
+        SI_ANSWER,
+    ),
+    "near limit": (
+        {"context": "presidents_office", "question": "How do I submit a petition? " * 60,
+         "conversation_history": history(settings.chat_max_history_messages // 2, "Earlier question about petitions")},
+        SI_ANSWER * 3,
+    ),
+}
+
+
+def old_decode(raw: bytes):
+    body = json.loads(raw)
+    return (body.get("context"), body.get("question"), body.get("conversation_history", []),
+            body.get("language"), body.get("session_id"))
+
+
+def new_decode(raw: bytes):
+    request = ChatRequest.model_validate(orjson.loads(raw))
+    return (request.context, request.question, request.conversation_history or [],
+            request.language, request.session_id)
+
+
+async def old_encode(response: ChatResponse, field) -> bytes:
+    # What FastAPI does with a returned model when the route declares response_model
+    content = await serialize_response(field=field, response_content=response, is_coroutine=True)
+    return JSONResponse(content=content).body
+
+
+def new_encode(response: ChatResponse, field=None) -> bytes:
+    return ORJSONResponse(content=response.model_dump()).body
+
+
+def time_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def time_per_await(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /chat request decoding and response encoding")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    field = APIRoute("/chat", lambda: None, response_model=ChatResponse).response_field
+    print(f"{'payload':<16}{'bytes':>8}{'old decode':>12}{'new decode':>12}"
+          f"{'old encode':>12}{'new encode':>12}{'old total':>11}{'new total':>11}{'speedup':>9}")
+    for name, (body, answer) in PAYLOADS.items():
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        response = ChatResponse(answer=answer, context_used=body["context"], success=True,
+                                detected_language=body.get("language", "en"))
+        assert old_decode(raw) == new_decode(raw)
+        assert json.loads(asyncio.run(old_encode(response, field))) == json.loads(new_encode(response))
+
+        old_decode_us = time_per_call(lambda: old_decode(raw), args.iterations)
+        new_decode_us = time_per_call(lambda: new_decode(raw), args.iterations)
+        old_encode_us = asyncio.run(time_per_await(lambda: old_encode(response, field), args.iterations))
+        new_encode_us = time_per_call(lambda: new_encode(response), args.iterations)
+        old_total = old_decode_us + old_encode_us
+        new_total = new_decode_us + new_encode_us
+        print(f"{name:<16}{len(raw):>8}{old_decode_us:>10.1f}us{new_decode_us:>10.1f}us"
+              f"{old_encode_us:>10.1f}us{new_encode_us:>10.1f}us{old_total:>9.1f}us{new_total:>9.1f}us"
+              f"{old_total / new_total:>8.1f}x")
+
+    oversized = json.dumps({"context": "presidents_fund",
+                            "question": "x" * (settings.chat_max_question_chars + 1)}).encode("utf-8")
+    started = time.perf_counter()
+    try:
+        new_decode(oversized)
+    except ValueError:
+        pass
+    print(f"\nQuestion over CHAT_MAX_QUESTION_CHARS rejected in {(time.perf_counter() - started) * 1e6:.1f}us; "
+          f"bodies over CHAT_MAX_BODY_BYTES ({settings.chat_max_body_bytes}) are refused before decoding")
+
+
+if __name__ == "__main__":
+    main()
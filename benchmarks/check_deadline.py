@@ -0,0 +1,90 @@
+"""
+Check of the /chat deadline path against a slow stub LLM.
+
+Runs the app in process with LLM_BACKEND=stub and a stub latency above the
+deadline, then asks LLM-bound questions of the shipped contexts and checks
+that each comes back degraded, with the context's local candidate, within
+the deadline; that a budget above the stub latency still gets the LLM
+answer; and that the abandoned call went on to fill the answer cache.
+Exits with status 1 on any failure.
+
+    python -m benchmarks.check_deadline
+    python -m benchmarks.check_deadline --latency 2 --deadline 0.3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+
+async def check(latency: float, deadline: float) -> list:
+    import httpx
+
+    from app.contexts.registry import registry
+    from app.main import app
+
+    failures = []
+
+    async def ask(client, body: dict):
+        started = time.perf_counter()
+        response = await client.post("/chat", json=body)
+        return response, time.perf_counter() - started
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=latency * 4) as client:
+        probes = [
+            ("presidents_office", "en", "How can I submit a petition?"),
+            ("default", "en", "Where can I renew my passport?"),
+            ("presidents_fund", "fr", "Comment obtenir une demande ?"),
+        ]
+        for context, language, question in probes:
+            expected = registry.get(context, language).fallback_answer
+            response, elapsed = await ask(client, {"context": context, "language": language, "question": question,
+                                                   "deadline": deadline})
+            data = response.json()
+            tier = response.headers.get("x-answer-tier")
+            print(f"{context + '/' + language:<22}{tier:<9} {elapsed:6.2f}s  degraded={data['degraded']}")
+            if tier != "degraded" or not data["degraded"] or data["answer"] != expected:
+                failures.append(f"{context}/{language}: tier {tier}, degraded {data['degraded']}")
+            if elapsed > deadline + 0.2:
+                failures.append(f"{context}/{language}: answered after {elapsed:.2f}s, deadline {deadline}s")
+
+        response, elapsed = await ask(client, {"context": "presidents_office", "question": "Who signs official letters?",
+                                               "deadline": latency * 3})
+        tier = response.headers.get("x-answer-tier")
+        print(f"{'generous budget':<22}{tier:<9} {elapsed:6.2f}s")
+        if tier != "llm" or response.json()["degraded"]:
+            failures.append(f"budget above the LLM latency: tier {tier}")
+
+        # The degraded question's LLM call kept running; once it is done the answer is cached
+        await asyncio.sleep(latency)
+        response, _ = await ask(client, {"context": "presidents_office", "question": "How can I submit a petition?",
+                                         "deadline": deadline})
+        tier = response.headers.get("x-answer-tier")
+        print(f"{'after the late call':<22}{tier}")
+        if tier != "cache":
+            failures.append(f"late LLM answer was not cached: tier {tier}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.5, help="stub LLM latency in seconds")
+    parser.add_argument("--deadline", type=float, default=0.3, help="per-request budget in seconds")
+    args = parser.parse_args()
+
+    # Settings are read at import, so configure the stub before importing the app
+    os.environ.update(LLM_BACKEND="stub", LLM_STUB_LATENCY=str(args.latency), ANSWER_CACHE_ENABLED="true",
+                      ANSWER_STORE_PATH="", QUERY_LOG_PATH="", ADMISSION_ENABLED="false")
+    failures = asyncio.run(check(args.latency, args.deadline))
+    if failures:
+        print("\nFailures:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nDeadline path OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Serves POST /openai/v1/chat/completions in the OpenAI wire format, both
+plain JSON and streamed Server-Sent Events, after a configurable delay.
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+Faults can be injected per request: a share of requests fail with HTTP 500,
+a share are slowed down, and each model can have its own latency. The fault
+settings can be changed while running with POST /faults.
+
+    python -m benchmarks.fake_groq --port 8100 --latency 0.8 --jitter 0.2 --tokens 60
+    python -m benchmarks.fake_groq --error-rate 0.2 --slow-rate 0.05 --slow-latency 10 \
+        --model-latency llama-3.1-8b-instant=0.2
+    curl -X POST localhost:8100/faults -d '{"error_rate": 1.0, "models": ["llama-3.3-70b-versatile"]}'
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def create_app(latency: float = 0.5, jitter: float = 0.0, tokens: int = 40,
+               first_token_latency: float = None, seed: int = None, error_rate: float = 0.0,
+               slow_rate: float = 0.0, slow_latency: float = 10.0, model_latency: dict = None,
+               fault_models: list = None) -> FastAPI:
+    """
+    latency: seconds until a non-streamed completion returns (or the last token is sent)
+    jitter: uniform +/- seconds added to latency per request
+    tokens: number of tokens in each answer
+    first_token_latency: seconds until the first streamed token (defaults to latency / 4)
+    error_rate: share of requests answered with HTTP 500
+    slow_rate: share of requests that take slow_latency seconds instead
+    model_latency: per-model latency overriding `latency`
+    fault_models: models the error/slow injection applies to (default: all)
+    """
+    app = FastAPI(title="Fake Groq")
+    rng = random.Random(seed)
+    app.state.requests = 0
+    app.state.errors = 0
+    app.state.slow = 0
+    app.state.by_model = {}
+    app.state.faults = {
+        "error_rate": error_rate,
+        "slow_rate": slow_rate,
+        "slow_latency": slow_latency,
+        "model_latency": dict(model_latency or {}),
+        "models": list(fault_models or []),
+    }
+
+    def answer_tokens(body: dict) -> list:
+        question = body["messages"][-1]["content"] if body.get("messages") else ""
+        words = f"Answer to: {question}".split()
+        filler = ["lorem", "ipsum", "dolor", "sit", "amet"]
+        words += [filler[i % len(filler)] for i in range(max(0, tokens - len(words)))]
+        return [w if i == 0 else " " + w for i, w in enumerate(words[:max(tokens, 1)])]
+
+    def delay(model: str, faulty: bool) -> float:
+        faults = app.state.faults
+        if faulty and rng.random() < faults["slow_rate"]:
+            app.state.slow += 1
+            return faults["slow_latency"]
+        base = faults["model_latency"].get(model, latency)
+        return max(0.0, base + rng.uniform(-jitter, jitter))
+
+    def usage(body: dict, completion_tokens: int) -> dict:
+        prompt_tokens = sum(len(m.get("content", "")) // 4 for m in body.get("messages", []))
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    @app.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "fake-model")
+        app.state.by_model[model] = app.state.by_model.get(model, 0) + 1
+        faults = app.state.faults
+        faulty = not faults["models"] or model in faults["models"]
+        if faulty and rng.random() < faults["error_rate"]:
+            app.state.errors += 1
+            await asyncio.sleep(min(latency, 0.05))
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Injected upstream failure", "type": "internal_server_error"}},
+            )
+        words = answer_tokens(body)
+        total = delay(model, faulty)
+
+        if not body.get("stream"):
+            await asyncio.sleep(total)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage(body, len(words)),
+            })
+
+        first = first_token_latency if first_token_latency is not None else total / 4
+        interval = max(0.0, total - first) / max(len(words), 1)
+
+        async def events():
+            await asyncio.sleep(first)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(interval)
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"usage": usage(body, len(words))},
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            "requests": app.state.requests,
+            "errors": app.state.errors,
+            "slow": app.state.slow,
+            "by_model": app.state.by_model,
+            "faults": app.state.faults,
+        }
+
+    @app.post("/faults")
+    async def set_faults(request: Request):
+        """Change any of error_rate, slow_rate, slow_latency, model_latency and models."""
+        changes = await request.json()
+        unknown = set(changes) - set(app.state.faults)
+        if unknown:
+            return JSONResponse(status_code=400, content={"error": f"Unknown fault settings: {sorted(unknown)}"})
+        app.state.faults.update(changes)
+        return app.state.faults
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--first-token-latency", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with HTTP 500")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests taking --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=10.0)
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SECONDS",
+                        help="per-model latency, repeatable")
+    parser.add_argument("--fault-model", action="append", default=[], metavar="MODEL",
+                        help="only inject errors/slowness for this model, repeatable")
+    args = parser.parse_args()
+    model_latency = {}
+    for item in args.model_latency:
+        model, _, seconds = item.rpartition("=")
+        model_latency[model] = float(seconds)
+    app = create_app(args.latency, args.jitter, args.tokens, args.first_token_latency, args.seed,
+                     error_rate=args.error_rate, slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+                     model_latency=model_latency, fault_models=args.fault_model)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+End-to-end load benchmark for the chat API.
+
+Starts a fake Groq upstream (benchmarks.fake_groq) and the FastAPI app under
+uvicorn, then replays the q-and-a.txt questions, requests.jsonl and a few tier
+probes at a fixed concurrency. Reports throughput and p50/p95/p99 latency
+overall, per answering tier (X-Answer-Tier header) and per language, and
+writes the numbers to a JSON file that can be diffed between commits.
+
+    python -m benchmarks.load_test --requests 2000 --concurrency 32 --latency 0.5
+    python -m benchmarks.load_test --stream --output bench_stream.json
+    python -m benchmarks.load_test --workers 4 --shared-cache /tmp/answers.db
+    python -m benchmarks.load_test --no-cache --models big:2,small:1 --model-latency small=0.2 \
+        --slow-rate 0.1 --slow-latency 5 --error-rate 0.05
+    python -m benchmarks.load_test --app-url http://localhost:8000   # existing server
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.workload import QA_FILE, REQUESTS_FILE, ROOT, build_workload
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list, elapsed: float = None) -> dict:
+    latencies = [s["latency_ms"] for s in samples]
+    summary = {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s["error"]),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+    }
+    ttfts = [s["ttft_ms"] for s in samples if s.get("ttft_ms") is not None]
+    if ttfts:
+        summary["ttft_p50_ms"] = round(percentile(ttfts, 50), 2)
+        summary["ttft_p95_ms"] = round(percentile(ttfts, 95), 2)
+    if elapsed:
+        summary["throughput_rps"] = round(len(samples) / elapsed, 2)
+    return summary
+
+
+async def send(client: httpx.AsyncClient, item: dict, stream: bool) -> dict:
+    started = time.perf_counter()
+    sample = {"language": item["language"], "tier": "error", "error": False, "ttft_ms": None}
+    try:
+        if stream:
+            async with client.stream("POST", "/chat/stream", json=item) as response:
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[7:]
+                    elif line.startswith("data: ") and event:
+                        data = json.loads(line[6:])
+                        if event == "token" and sample["ttft_ms"] is None:
+                            sample["ttft_ms"] = (time.perf_counter() - started) * 1000
+                            sample["tier"] = "llm"
+                        elif event == "answer":
+                            sample["tier"] = data.get("tier", "local")
+                        elif event == "error":
+                            sample["error"] = True
+        else:
+            response = await client.post("/chat", json=item)
+            sample["tier"] = response.headers.get("x-answer-tier", "unknown")
+            sample["error"] = response.status_code >= 500 or sample["tier"] == "error"
+    except httpx.HTTPError:
+        sample["error"] = True
+    sample["latency_ms"] = (time.perf_counter() - started) * 1000
+    return sample
+
+
+async def run_load(app_url: str, workload: list, total: int, concurrency: int, stream: bool, timeout: float) -> tuple:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    samples = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(workload[i % len(workload)])
+
+    async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=timeout) as client:
+        async def worker():
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                samples.append(await send(client, item, stream))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def wait_for(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="total requests to send")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stream", action="store_true", help="use /chat/stream instead of /chat")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake upstream completion latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake upstream HTTP 500 share")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fake upstream share of slow requests")
+    parser.add_argument("--slow-latency", type=float, default=10.0)
+    parser.add_argument("--client-rate", type=float, default=0.0,
+                        help="per-client LLM admission rate in the app (0: off, as all load comes from one IP)")
+    parser.add_argument("--models", default=None, help='LLM_MODELS for the app, e.g. "big:5,small:2"')
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SECONDS")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--upstream-port", type=int, default=8766)
+    parser.add_argument("--app-url", default=None, help="benchmark an already running app instead of starting one")
+    parser.add_argument("--context", default="presidents_fund")
+    parser.add_argument("--qa-file", default=QA_FILE)
+    parser.add_argument("--requests-file", default=REQUESTS_FILE)
+    parser.add_argument("--no-cache", action="store_true", help="disable the answer cache in the app")
+    parser.add_argument("--shared-cache", default=None, metavar="PATH",
+                        help="SQLite file for the cross-worker answer store (removed before the run)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args()
+
+    workload = build_workload(args.context, args.qa_file, args.requests_file)
+    processes = []
+    app_url = args.app_url
+    try:
+        if app_url is None:
+            upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "benchmarks.fake_groq",
+                "--port", str(args.upstream_port),
+                "--latency", str(args.latency),
+                "--jitter", str(args.jitter),
+                "--tokens", str(args.tokens),
+                "--error-rate", str(args.error_rate),
+                "--slow-rate", str(args.slow_rate),
+                "--slow-latency", str(args.slow_latency),
+                *[arg for item in args.model_latency for arg in ("--model-latency", item)],
+            ], cwd=ROOT))
+            wait_for(f"{upstream_url}/stats")
+
+            env = dict(os.environ, GROQ_BASE_URL=upstream_url, GROQ_API_KEY="fake-key", LLM_BACKEND="groq",
+                       ADMISSION_CLIENT_RATE=str(args.client_rate))
+            if args.no_cache:
+                env["ANSWER_CACHE_ENABLED"] = "false"
+            if args.models:
+                env["LLM_MODELS"] = args.models
+            if args.shared_cache:
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(args.shared_cache + suffix):
+                        os.remove(args.shared_cache + suffix)
+                env["ANSWER_STORE_PATH"] = args.shared_cache
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(args.app_port),
+                "--workers", str(args.workers), "--log-level", "warning",
+            ], cwd=ROOT, env=env))
+            app_url = f"http://127.0.0.1:{args.app_port}"
+            wait_for(f"{app_url}/health")
+
+        samples, elapsed = asyncio.run(
+            run_load(app_url, workload, args.requests, args.concurrency, args.stream, args.timeout)
+        )
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    by_tier, by_language = defaultdict(list), defaultdict(list)
+    for sample in samples:
+        by_tier[sample["tier"]].append(sample)
+        by_language[sample["language"]].append(sample)
+
+    report = {
+        "revision": git_revision(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "stream": args.stream,
+            "upstream_latency_s": args.latency,
+            "upstream_jitter_s": args.jitter,
+            "upstream_tokens": args.tokens,
+            "upstream_error_rate": args.error_rate,
+            "upstream_slow_rate": args.slow_rate,
+            "models": args.models,
+            "client_rate": args.client_rate,
+            "workers": args.workers,
+            "answer_cache": not args.no_cache,
+            "shared_answer_store": bool(args.shared_cache) and not args.no_cache,
+            "workload_size": len(workload),
+        },
+        "overall": summarize(samples, elapsed),
+        "by_tier": {tier: summarize(group) for tier, group in sorted(by_tier.items())},
+        "by_language": {language: summarize(group) for language, group in sorted(by_language.items())},
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    overall = report["overall"]
+    print(f"{overall['requests']} requests in {elapsed:.2f}s, {overall['throughput_rps']} req/s, "
+          f"{overall['errors']} errors")
+    print(f"{'group':<22}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label, groups in (("tier", report["by_tier"]), ("lang", report["by_language"])):
+        for name, summary in groups.items():
+            print(f"{label + ':' + name:<22}{summary['requests']:>7}{summary['p50_ms']:>10.1f}"
+                  f"{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
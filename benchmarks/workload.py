@@ -0,0 +1,92 @@
+"""Question sets shared by the benchmarks."""
+import json
+import os
+
+from app.text import script_profile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QA_FILE = os.path.join(ROOT, "q-and-a.txt")
+REQUESTS_FILE = os.path.join(ROOT, "requests.jsonl")
+
+# Probes for the tiers q-and-a.txt does not reach: (tier, context, language, question).
+# presidents_office has no FAQ handler, so its questions go to the LLM.
+TIER_PROBES = [
+    ("greeting", "presidents_fund", "en", "Hello"),
+    ("greeting", "presidents_fund", "si", "ආයුබෝවන්"),
+    ("greeting", "presidents_fund", "ta", "வணக்கம்"),
+    ("moderation", "presidents_fund", "en", "this is a damn slow process"),
+    ("common_question", "presidents_fund", "en", "Tell me about the fund"),
+    ("llm", "presidents_office", "en", "Can I submit a petition to the President online?"),
+    ("llm", "presidents_office", "en", "Which ministry coordinates with the Presidential Secretariat on land disputes?"),
+    ("llm", "presidents_office", "si", "ජනාධිපති කාර්යාලයට පෙත්සමක් යවන්නේ කෙසේද?"),
+    ("llm", "presidents_office", "ta", "ஜனாதிபதி அலுவலகத்திற்கு மனு அனுப்புவது எப்படி?"),
+]
+
+
+def detect_language(text: str) -> str:
+    return script_profile(text).dominant() or "en"
+
+
+def load_qa_pairs(path: str = QA_FILE) -> list:
+    """
+    Parse q-and-a.txt into {"language", "question", "answer"} dicts.
+    Blocks are a question line followed by an answer line; '====' lines separate languages.
+    """
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    block = []
+    for line in lines + [""]:
+        if line and not line.startswith("="):
+            block.append(line)
+            continue
+        if len(block) >= 2:
+            pairs.append({
+                "language": detect_language(block[0]),
+                "question": block[0],
+                "answer": " ".join(block[1:]),
+            })
+        block = []
+    return pairs
+
+
+def load_request_log(path: str = REQUESTS_FILE) -> list:
+    """
+    Read recorded requests from a JSONL file. Lines with a 'question' are used as-is;
+    lines with only a 'title' use it as the question. Missing files give an empty list.
+    """
+    if not os.path.exists(path):
+        return []
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            question = record.get("question") or record.get("title")
+            if not question:
+                continue
+            items.append({
+                "context": record.get("context", "presidents_fund"),
+                "language": record.get("language") or detect_language(question),
+                "question": question,
+            })
+    return items
+
+
+def build_workload(context: str = "presidents_fund", qa_path: str = QA_FILE, requests_path: str = REQUESTS_FILE) -> list:
+    """All replayable chat requests: q-and-a.txt questions, the request log and tier probes."""
+    items = [
+        {"context": context, "language": pair["language"], "question": pair["question"]}
+        for pair in load_qa_pairs(qa_path)
+    ]
+    items.extend(load_request_log(requests_path))
+    items.extend(
+        {"context": probe_context, "language": language, "question": question}
+        for _, probe_context, language, question in TIER_PROBES
+    )
+    return items